@@ -0,0 +1,128 @@
+import random
+import pygame
+from constants import CELL_COUNT, CELL_SIZE, SCREEN_HEIGHT, SCREEN_WIDTH
+
+FLOOR_HEIGHT = CELL_COUNT * CELL_SIZE // 2
+
+# name -> (path, size, has_alpha)
+IMAGE_SPECS = {
+    "hunt_left": ("assets/hunt_left.png", (CELL_SIZE, CELL_SIZE), True),
+    "hunt_right": ("assets/hunt_right.png", (CELL_SIZE, CELL_SIZE), True),
+    "hunt_up": ("assets/hunt_up.png", (CELL_SIZE, CELL_SIZE), True),
+    "hunt_down": ("assets/hunt_down.png", (CELL_SIZE, CELL_SIZE), True),
+    "coal_cart_horizontal": (
+        "assets/coal_cart_horizontal.png",
+        (CELL_SIZE, CELL_SIZE),
+        True,
+    ),
+    "coal_cart_vertical": (
+        "assets/coal_cart_vertical.png",
+        (CELL_SIZE, CELL_SIZE),
+        True,
+    ),
+    "coal": ("assets/coal.png", (CELL_SIZE, CELL_SIZE // 2), True),
+    "speedup": ("assets/speedup.png", None, True),
+    "torch": ("assets/torch.png", None, True),
+    "background": (
+        "assets/background.png",
+        (SCREEN_WIDTH, SCREEN_HEIGHT - FLOOR_HEIGHT),
+        False,
+    ),
+    "floor1": ("assets/floor1.png", (CELL_SIZE, CELL_SIZE // 2), True),
+    "floor2": ("assets/floor2.png", (CELL_SIZE, CELL_SIZE // 2), True),
+    "floor3": ("assets/floor3.png", (CELL_SIZE, CELL_SIZE // 2), True),
+    "floor4": ("assets/floor4.png", (CELL_SIZE, CELL_SIZE // 2), True),
+}
+
+SOUND_SPECS = {
+    "plop": ("assets/sounds/plop.mp3", 1.0),
+    "crash": ("assets/sounds/crash.mp3", 0.3),
+}
+
+_images = {}
+_sounds = {}
+
+
+def get_image(name):
+    # Falls back to a blocking load if the preloader has not reached it yet
+    if name not in _images:
+        path, size, has_alpha = IMAGE_SPECS[name]
+        image = pygame.image.load(path)
+        image = image.convert_alpha() if has_alpha else image.convert()
+        if size:
+            image = pygame.transform.scale(image, size)
+        _images[name] = image
+    return _images[name]
+
+
+def get_sound(name):
+    if name not in _sounds:
+        path, volume = SOUND_SPECS[name]
+        sound = pygame.mixer.Sound(path)
+        sound.set_volume(volume)
+        _sounds[name] = sound
+    return _sounds[name]
+
+
+def build_floor_rows(surface, seed=None):
+    # Yields after every row so the work can be spread over several frames.
+    # The tiles come from their own generator, so a seed always gives the
+    # same floor and building it leaves the random module alone.
+    rng = random.Random(seed)
+    floor_images = [get_image(f"floor{i}") for i in range(1, 5)]
+    for row in range(CELL_COUNT):
+        for col in range(CELL_COUNT):
+            img = rng.choice(floor_images)
+            surface.blit(img, (col * CELL_SIZE, row * CELL_SIZE // 2))
+        yield
+
+
+class AssetPreloader:
+    """Loads gameplay assets a few at a time between menu frames."""
+
+    def __init__(self):
+        self.jobs = []
+        self.total = 0
+        self.done = 0
+
+    def add(self, job):
+        # A job is either a callable or a generator that yields between steps
+        self.jobs.append(job)
+        self.total += 1
+
+    def add_defaults(self):
+        for name in IMAGE_SPECS:
+            self.add(lambda name=name: get_image(name))
+        if pygame.mixer.get_init():
+            for name in SOUND_SPECS:
+                self.add(lambda name=name: get_sound(name))
+
+    @property
+    def ready(self):
+        return not self.jobs
+
+    @property
+    def progress(self):
+        return self.done / self.total if self.total else 1.0
+
+    def step(self, budget_ms=4):
+        start = pygame.time.get_ticks()
+        while self.jobs and pygame.time.get_ticks() - start < budget_ms:
+            self.__run_one()
+
+    def finish(self):
+        while self.jobs:
+            self.__run_one()
+
+    def __run_one(self):
+        job = self.jobs[0]
+        if callable(job):
+            job()
+        else:
+            try:
+                next(job)
+                return
+            except StopIteration:
+                pass
+        self.jobs.pop(0)
+        self.done += 1
@@ -0,0 +1,88 @@
+import threading
+import pygame
+from assets import get_sound
+
+RESERVED_CHANNELS = 8
+
+# name -> (max voices playing at once, minimum ms between two starts)
+SOUND_LIMITS = {
+    "plop": (2, 60),
+    "crash": (1, 300),
+}
+DEFAULT_LIMIT = (1, 100)
+
+
+class AudioService:
+    """Plays effects on a fixed pool of reserved mixer channels.
+
+    play() only records the request, so it is cheap to call from the
+    simulation thread. flush() runs once per frame and starts at most one
+    voice per queued sound, however many times it was requested that frame.
+    """
+
+    def __init__(self, num_channels=RESERVED_CHANNELS):
+        self.num_channels = num_channels
+        self.channels = []
+        self.queued = set()
+        self.last_played = {}
+        self.lock = threading.Lock()
+        self.enabled = False
+
+    def init(self):
+        if not pygame.mixer.get_init():
+            print("Audio not available, continuing without sound.")
+            return
+        if pygame.mixer.get_num_channels() < self.num_channels:
+            pygame.mixer.set_num_channels(self.num_channels)
+        pygame.mixer.set_reserved(self.num_channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.num_channels)]
+        self.enabled = True
+
+    def play(self, name):
+        with self.lock:
+            self.queued.add(name)
+
+    def clear(self):
+        with self.lock:
+            self.queued.clear()
+
+    def flush(self):
+        with self.lock:
+            queued, self.queued = self.queued, set()
+        if not self.enabled:
+            return
+        now = pygame.time.get_ticks()
+        for name in queued:
+            max_voices, cooldown_ms = SOUND_LIMITS.get(name, DEFAULT_LIMIT)
+            if now - self.last_played.get(name, -cooldown_ms) < cooldown_ms:
+                continue
+            sound = get_sound(name)
+            voices = 0
+            free = None
+            for channel in self.channels:
+                if not channel.get_busy():
+                    if free is None:
+                        free = channel
+                elif channel.get_sound() is sound:
+                    voices += 1
+            if free is None or voices >= max_voices:
+                continue
+            free.play(sound)
+            self.last_played[name] = now
+
+    def play_music(self, path, volume):
+        if not self.enabled:
+            return
+        try:
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(volume)
+            pygame.mixer.music.play(-1)
+        except pygame.error:
+            print(f"Music {path} not available, continuing without it.")
+
+    def stop_music(self):
+        if self.enabled:
+            pygame.mixer.music.stop()
+
+
+audio = AudioService()
@@ -0,0 +1,34 @@
+import pygame
+from pygame.math import Vector2
+
+KEY_DIRECTIONS = {
+    pygame.K_UP: Vector2(0, -1),
+    pygame.K_DOWN: Vector2(0, 1),
+    pygame.K_LEFT: Vector2(-1, 0),
+    pygame.K_RIGHT: Vector2(1, 0),
+}
+
+
+class InputQueue:
+    """Buffers direction presses so each simulation tick applies at most one."""
+
+    def __init__(self, max_size=3):
+        self.max_size = max_size
+        self.directions = []
+
+    def clear(self):
+        self.directions.clear()
+
+    def handle_key(self, key):
+        direction = KEY_DIRECTIONS.get(key)
+        if direction is not None and len(self.directions) < self.max_size:
+            self.directions.append(Vector2(direction))
+
+    def next_direction(self, current):
+        # Checked against the direction actually applied last tick, not the
+        # one that was current when the key was pressed
+        while self.directions:
+            direction = self.directions.pop(0)
+            if direction != current and direction != -current:
+                return direction
+        return None
@@ -1,20 +1,18 @@
 from pygame.math import Vector2
 from constants import CELL_COUNT
 from entities.train import Train
+from event_bus import TrainDied, bus
+from telemetry import AI_RAM, telemetry
 
 
 class AITrain(Train):
     def __init__(self, position=None):
         super().__init__()
-        start = position if position else Vector2(15, 10)
-        self.body = [start, start - Vector2(1, 0), start - Vector2(2, 0)]
-        self.direction = Vector2(1, 0)
-        self.alive = True
-        self.respawn_timer = 0  # milliseconds timestamp
+        self.reset(position)
 
-    def die(self, coal=None):
+    def die(self, coal=None, cause="unknown"):
         if self.respawn_timer == 0:
-            print("AI died at:", self.body[0])
+            bus.publish(TrainDied(self.body[0], cause, True, len(self.body) - 3))
             self.alive = False
             if coal:
                 coal.spawn_at(self.body)
@@ -32,35 +30,42 @@ class AITrain(Train):
         )
 
     def reset(self, position=None):
+        super().reset()
         start = position if position else Vector2(15, 10)
         self.body = [start, start - Vector2(1, 0), start - Vector2(2, 0)]
         self.direction = Vector2(1, 0)
         self.alive = True
-        self.respawn_timer = 0
+        self.respawn_timer = 0  # milliseconds timestamp
 
-    def update_ai(self, coal_positions, avoid_positions, coal=None):
+    def update_ai(self, coal_positions, avoid_positions, coal=None, field=None, player_direction=None):
         if not self.alive:
             return
 
-        head_before = self.body[0]
-        if coal_positions:
-            target = min(coal_positions, key=lambda c: head_before.distance_to(c))
-            self.__steer_towards(target, avoid_positions, coal)
+        self.steer(coal_positions, avoid_positions, coal, field, player_direction)
 
         self.update()
         head = self.body[0]
 
         if not (0 <= head.x < CELL_COUNT and 0 <= head.y < CELL_COUNT):
-            print("AI died by wall at:", head)
-            self.die(coal)
+            self.die(coal, "wall")
         elif head in self.body[1:]:
-            print("AI died by self-collision at:", head)
-            self.die(coal)
+            self.die(coal, "self collision")
         elif head in avoid_positions:
-            print("AI died by player collision at:", head)
-            self.die(coal)
+            self.die(coal, "player collision")
+
+    def steer(self, coal_positions, avoid_positions, coal=None, field=None, player_direction=None):
+        # Greedy one move lookahead towards the nearest coal. With a shared
+        # DistanceField the nearest coal is the one with the shortest path
+        # around the trains; otherwise it is the closest in a straight line.
+        head_before = self.body[0]
+        if field is not None:
+            if coal_positions:
+                self.__steer_towards(field.distance, avoid_positions, coal)
+        elif coal_positions:
+            target = min(coal_positions, key=lambda c: head_before.distance_to(c))
+            self.__steer_towards(target.distance_to, avoid_positions, coal)
 
-    def __steer_towards(self, target, avoid_positions, coal):
+    def __steer_towards(self, distance, avoid_positions, coal):
         import random
 
         head = self.body[0]
@@ -82,21 +87,27 @@ class AITrain(Train):
             # ✅ Allow intentional suicide if we're moving into the player's body
             if is_collision:
                 if new_head in avoid_positions and option == self.direction:
-                    print(f"AI is intentionally colliding into player at {new_head}")
-                    dist = new_head.distance_to(target)
-                    safe_moves.append((option, dist))
+                    # A distance field marks the player's cells unreachable,
+                    # so score the cell as if it were free: one step past
+                    # its best neighbour
+                    dist = min(
+                        [distance(new_head)]
+                        + [distance(new_head + other) + 1 for other in options]
+                    )
+                    safe_moves.append((option, dist, True))
                     continue
                 continue
 
             # Prefer non-reversing direction
             penalty = 1 if option == opposite else 0
-            dist = new_head.distance_to(target) + penalty
-            safe_moves.append((option, dist))
+            dist = distance(new_head) + penalty
+            safe_moves.append((option, dist, False))
 
         if safe_moves:
             min_dist = min(safe_moves, key=lambda x: x[1])[1]
             candidates = [opt for opt in safe_moves if abs(opt[1] - min_dist) < 0.1]
-            self.direction = random.choice(candidates)[0]
+            self.direction, _, ram = random.choice(candidates)
+            if ram:
+                telemetry.record(AI_RAM, head + self.direction)
         else:
-            print(f"AI has no safe move from {head}. Dying.")
-            self.die(coal)
+            self.die(coal, "trapped")
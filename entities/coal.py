@@ -7,40 +7,53 @@ import random
 import pygame
 import random
 from pygame.math import Vector2
+from assets import get_image
 from constants import CELL_COUNT, CELL_SIZE, SCREEN_HEIGHT
 
 
+def random_coal_cell(rng=random, margin=3):
+    # Coal only ever lands on even rows, away from the edges
+    x = rng.randint(margin, CELL_COUNT - 1 - margin)
+    y = rng.randint(0, (CELL_COUNT // 2) - 1) * 2
+    y = max(y, margin)
+    y = min(y, CELL_COUNT - 1 - margin)
+    return x, y
+
+
 class Coal:
     def __init__(self):
         self.positions = []
         self.margin = 3
+        self.image = None
+        self.image_loaded = False
+
+    def load_image(self):
+        self.image_loaded = True
         try:
-            self.image = pygame.image.load("assets/coal.png").convert_alpha()
-            self.image = pygame.transform.scale(self.image, (CELL_SIZE, CELL_SIZE // 2))
+            self.image = get_image("coal")
         except Exception:
             self.image = None
 
     def clear(self):
         self.positions.clear()
 
-    def spawn_random(self, count=1):
+    def spawn_random(self, count=1, rng=random):
         for _ in range(count):
-            x = random.randint(self.margin, CELL_COUNT - 1 - self.margin)
-            y = random.randint(0, (CELL_COUNT // 2) - 1) * 2
-            y = max(y, self.margin)
-            y = min(y, CELL_COUNT - 1 - self.margin)
+            x, y = random_coal_cell(rng, self.margin)
             self.positions.append(Vector2(x, y))
 
     def spawn_at(self, pos_list):
         for pos in pos_list:
             self.positions.append(Vector2(pos.x, pos.y))
 
-    def draw(self, screen):
+    def draw(self, screen, positions=None):
+        if not self.image_loaded:
+            self.load_image()
         if not self.image:
             return
 
         offset_y = SCREEN_HEIGHT - (CELL_COUNT * CELL_SIZE // 2)
-        for pos in self.positions:
+        for pos in self.positions if positions is None else positions:
             x = int(pos.x * CELL_SIZE)
             y = int(pos.y * CELL_SIZE // 2 + offset_y)
             screen.blit(self.image, (x, y))
@@ -48,8 +61,6 @@ class Coal:
     def check_pickup(self, head_pos):
         for i, pos in enumerate(self.positions):
             if pos == head_pos:
-                plop_sound = pygame.mixer.Sound("assets/sounds/plop.mp3")
-                plop_sound.play()
                 del self.positions[i]
                 return True
         return False
@@ -9,6 +9,12 @@ class PowerUpType(Enum):
     TORCH = 2
 
 
+POWERUP_IMAGES = {
+    PowerUpType.SPEED_BOOST: "speedup",
+    PowerUpType.TORCH: "torch",
+}
+
+
 class PowerUpEntity:
     def __init__(self, type: PowerUpType, pos: Vector2, image):
         self.type = type
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+from pygame.math import Vector2
+from entities.ai_train import AITrain
+from simulation.bitboard import BitboardSimulation
+from simulation.search import MinimaxSearch
+
+# One shared worker so searches never pile up behind each other
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-search")
+
+
+def _cells(body):
+    return [(int(block.x), int(block.y)) for block in body]
+
+
+class SearchAITrain(AITrain):
+    """AITrain that plans with MinimaxSearch instead of the greedy steer.
+
+    After each move the next search starts on a worker thread from the new
+    position, so it runs while the game renders frames until the next tick.
+    """
+
+    def __init__(self, position=None, budget_ms=5):
+        self.search = MinimaxSearch(budget_ms=budget_ms)
+        self.pending = None
+        super().__init__(position)
+
+    def reset(self, position=None):
+        super().reset(position)
+        if self.pending is not None:
+            # The worker may still be inside self.search.choose(); it has to
+            # finish before steer() uses the same search. Its move was for
+            # the old position and is dropped.
+            if not self.pending.cancel():
+                self.pending.result()
+            self.pending = None
+
+    def snapshot(self, coal_positions, avoid_positions, player_direction=None):
+        # Without the real direction, guess it from the player's first two carts
+        if player_direction is None:
+            if len(avoid_positions) > 1:
+                player_direction = avoid_positions[0] - avoid_positions[1]
+            else:
+                player_direction = Vector2(0, 0)
+        return BitboardSimulation.from_positions(
+            _cells(avoid_positions),
+            (int(player_direction.x), int(player_direction.y)),
+            [_cells(self.body)],
+            [(int(self.direction.x), int(self.direction.y))],
+            _cells(coal_positions),
+        )
+
+    def steer(self, coal_positions, avoid_positions, coal=None, field=None, player_direction=None):
+        move = None
+        if self.pending is not None:
+            # Normally finished long ago; the budget bounds the wait otherwise
+            move = self.pending.result()
+            self.pending = None
+        if move is None:
+            move = self.search.choose(
+                self.snapshot(coal_positions, avoid_positions, player_direction)
+            )
+        if move is not None:
+            self.direction = Vector2(move)
+
+    def update_ai(self, coal_positions, avoid_positions, coal=None, field=None, player_direction=None):
+        super().update_ai(coal_positions, avoid_positions, coal, field, player_direction)
+        if self.alive:
+            sim = self.snapshot(coal_positions, avoid_positions, player_direction)
+            self.pending = _executor.submit(self.search.choose, sim)
@@ -9,6 +9,7 @@ from constants import (
 )
 from pygame.math import Vector2
 
+from assets import get_image
 from entities.powerup_entity import PowerUpType
 from powerups.speed_boost import SpeedBoost
 from powerups.torch import TorchPowerUp
@@ -16,44 +17,19 @@ from powerups.torch import TorchPowerUp
 
 class Train:
     def __init__(self):
-        self.body = [Vector2(5, 10), Vector2(4, 10), Vector2(3, 10)]
-        self.direction = Vector2(0, 0)
-        self.add_block_flag = False
-        self.__speed = 1
-        self.active_powerups = []
-        self.fog_disabled = False  # Used by fog of war
+        self.images_loaded = False
+        Train.reset(self)
 
-        # train images
+    def load_images(self):
+        # Sprites come from the shared asset cache, so this is cheap after preloading
+        self.images_loaded = True
         try:
-            image_huntLeft = pygame.image.load("assets/hunt_left.png").convert_alpha()
-            self.image_huntLeft = pygame.transform.scale(
-                image_huntLeft, (CELL_SIZE, CELL_SIZE)
-            )
-            image_huntRight = pygame.image.load("assets/hunt_right.png").convert_alpha()
-            self.image_huntRight = pygame.transform.scale(
-                image_huntRight, (CELL_SIZE, CELL_SIZE)
-            )
-            image_huntUp = pygame.image.load("assets/hunt_up.png").convert_alpha()
-            self.image_huntUp = pygame.transform.scale(
-                image_huntUp, (CELL_SIZE, CELL_SIZE)
-            )
-            image_huntDown = pygame.image.load("assets/hunt_down.png").convert_alpha()
-            self.image_huntDown = pygame.transform.scale(
-                image_huntDown, (CELL_SIZE, CELL_SIZE)
-            )
-
-            image_coalCartHorizontal = pygame.image.load(
-                "assets/coal_cart_horizontal.png"
-            ).convert_alpha()
-            self.image_coalCartHorizontal = pygame.transform.scale(
-                image_coalCartHorizontal, (CELL_SIZE, CELL_SIZE)
-            )
-            image_coalCartVertical = pygame.image.load(
-                "assets/coal_cart_vertical.png"
-            ).convert_alpha()
-            self.image_coalCartVertical = pygame.transform.scale(
-                image_coalCartVertical, (CELL_SIZE, CELL_SIZE)
-            )
+            self.image_huntLeft = get_image("hunt_left")
+            self.image_huntRight = get_image("hunt_right")
+            self.image_huntUp = get_image("hunt_up")
+            self.image_huntDown = get_image("hunt_down")
+            self.image_coalCartHorizontal = get_image("coal_cart_horizontal")
+            self.image_coalCartVertical = get_image("coal_cart_vertical")
         except Exception:
             print("Error loading train images, using colors instead.")
             self.image_huntLeft = pygame.Surface((CELL_SIZE, CELL_SIZE))
@@ -99,7 +75,17 @@ class Train:
         self.add_block_flag = True
 
     def reset(self):
-        self.__init__()
+        # Resets simulation state only; loaded sprites are kept
+        self.body = [Vector2(5, 10), Vector2(4, 10), Vector2(3, 10)]
+        self.direction = Vector2(0, 0)
+        self.add_block_flag = False
+        self.__speed = 1
+        self.active_powerups = []
+        self.fog_disabled = False  # Used by fog of war
+
+    @property
+    def speed(self):
+        return self.__speed
 
     def increaseSpeed(self):
         self.__speed = 2
@@ -118,29 +104,30 @@ class Train:
         powerup.apply(self)
         self.active_powerups.append(powerup)
 
-    def draw(self, screen):
+    def draw(self, screen, body=None, direction=None):
+        # body and direction may come from a published snapshot instead
+        if not self.images_loaded:
+            self.load_images()
         offset_y = SCREEN_HEIGHT - (CELL_COUNT * CELL_SIZE // 2)
-        body = (
-            list(reversed(self.body)) if self.direction == Vector2(0, 1) else self.body
-        )
-        body = self.body
+        body = self.body if body is None else body
+        direction = self.direction if direction is None else direction
 
         for index, block in enumerate(body):
             x = int(block.x * CELL_SIZE)
             y = int(block.y * CELL_SIZE // 2 + offset_y)
 
             if index == 0:
-                if self.direction == Vector2(1, 0):  # Moving right
+                if direction == Vector2(1, 0):  # Moving right
                     screen.blit(self.image_huntRight, (x, y - CELL_SIZE // 2))
-                elif self.direction == Vector2(-1, 0):  # Moving left
+                elif direction == Vector2(-1, 0):  # Moving left
                     screen.blit(self.image_huntLeft, (x, y - CELL_SIZE // 2))
-                elif self.direction == Vector2(0, -1):  # Moving up
+                elif direction == Vector2(0, -1):  # Moving up
                     screen.blit(self.image_huntUp, (x, y - CELL_SIZE // 2))
-                elif self.direction == Vector2(0, 1):  # Moving down
+                elif direction == Vector2(0, 1):  # Moving down
                     screen.blit(self.image_huntDown, (x, y - CELL_SIZE // 2))
                 continue
             else:
-                if self.direction.x != 0:  # Horizontal movement
+                if direction.x != 0:  # Horizontal movement
                     screen.blit(self.image_coalCartHorizontal, (x, y - CELL_SIZE // 2))
                 else:  # Vertical movement
                     screen.blit(self.image_coalCartVertical, (x, y - CELL_SIZE // 2))
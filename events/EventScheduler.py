@@ -1,4 +1,5 @@
 import random
+from event_bus import EventStarted, bus
 
 class EventScheduler:
     def __init__(self, event_cooldown=120):
@@ -25,3 +26,4 @@ class EventScheduler:
             event = random.choice(self.possible_events)
             event.start_event(game)
             self.current_events.append(event)
+            bus.publish(EventStarted(event.name))
@@ -0,0 +1,85 @@
+import pygame
+
+FOG_ALPHA = 245  # mostly dark
+
+
+class FogOfWar:
+    """Darkens the screen except for a light around each center.
+
+    The full-screen mask is cached and only rebuilt when a light moves or
+    changes, which happens once per simulation tick rather than every frame.
+    Opaque mode skips the mask entirely: the lit boxes are copied aside, the
+    screen is cleared to black and the boxes are put back under small masks,
+    so nothing is alpha blended across the whole screen.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.mask = pygame.Surface(size, pygame.SRCALPHA)
+        self.mask_key = None
+        self.merged = None
+        self.merged_key = None
+        self.lights = {}
+
+    def light(self, radius, soft, darkness):
+        # Dark at the corners and clear in the middle; blitted with
+        # BLEND_RGBA_MIN it cuts a hole into a mask
+        key = (radius, soft, darkness)
+        if key not in self.lights:
+            light = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            light.fill((0, 0, 0, darkness))
+            if soft:
+                rings = 12
+                for i in range(rings):
+                    r = radius - i * radius * 0.4 / rings
+                    alpha = int(darkness * (rings - 1 - i) / rings)
+                    pygame.draw.circle(light, (0, 0, 0, alpha), (radius, radius), r)
+            pygame.draw.circle(light, (0, 0, 0, 0), (radius, radius), radius * 0.6 if soft else radius)
+            self.lights[key] = light
+        return self.lights[key]
+
+    def draw(self, screen, centers, radius, soft=True, opaque=False):
+        if opaque:
+            self.__draw_opaque(screen, centers, radius)
+            return
+        key = (tuple(centers), radius, soft)
+        if key != self.mask_key:
+            self.mask.fill((0, 0, 0, FOG_ALPHA))
+            light = self.light(radius, soft, FOG_ALPHA)
+            for x, y in centers:
+                self.mask.blit(light, (x - radius, y - radius), special_flags=pygame.BLEND_RGBA_MIN)
+            self.mask_key = key
+        screen.blit(self.mask, (0, 0))
+
+    def __draw_opaque(self, screen, centers, radius):
+        boxes = [pygame.Rect(x - radius, y - radius, radius * 2, radius * 2) for x, y in centers]
+        if len(boxes) > 1 and boxes[0].collidelist(boxes[1:]) != -1:
+            # Overlapping lights share one box so neither darkens the other
+            groups = [(boxes[0].unionall(boxes[1:]), centers)]
+        else:
+            groups = [(box, [center]) for box, center in zip(boxes, centers)]
+
+        bounds = screen.get_rect()
+        patches = []
+        for box, lit in groups:
+            box = box.clip(bounds)
+            if box.width and box.height:
+                patches.append((box, lit, screen.subsurface(box).copy()))
+        screen.fill((0, 0, 0))
+        light = self.light(radius, False, 255)
+        for box, lit, patch in patches:
+            screen.blit(patch, box)
+            if len(lit) == 1:
+                # A lone light's box is exactly the cached stamp
+                x, y = lit[0]
+                screen.blit(light, (x - radius, y - radius))
+                continue
+            offsets = tuple((x - radius - box.x, y - radius - box.y) for x, y in lit)
+            key = (box.size, offsets)
+            if key != self.merged_key:
+                self.merged = pygame.Surface(box.size, pygame.SRCALPHA)
+                self.merged.fill((0, 0, 0, 255))
+                for offset in offsets:
+                    self.merged.blit(light, offset, special_flags=pygame.BLEND_RGBA_MIN)
+                self.merged_key = key
+            screen.blit(self.merged, box)
@@ -1,71 +1,120 @@
+import os
 import random
+import threading
 import pygame
 import sys
 from pygame.math import Vector2
 from constants import CELL_COUNT, CELL_SIZE, SCREEN_HEIGHT, SCREEN_WIDTH, SKY_COLOR
-from entities.powerup_entity import PowerUpEntity, PowerUpType
+from entities.powerup_entity import POWERUP_IMAGES, PowerUpEntity, PowerUpType
 from entities.train import Train
 from entities.coal import Coal
 from entities.ai_train import AITrain
+from entities.search_ai_train import SearchAITrain
 from menu import MainMenu, Menu, YouDiedMenu
+from ui import Label, View, get_font
 from events.EventScheduler import EventScheduler
 from events.Collapse import Collapse
 from utils import is_first_time, load_difficulty, mark_tutorial_done, save_difficulty
-
-
-pygame.init()
-
-SCREEN_UPDATE = pygame.USEREVENT
-pygame.time.set_timer(SCREEN_UPDATE, 150)
+from assets import FLOOR_HEIGHT, AssetPreloader, build_floor_rows, get_image
+from audio import audio
+from timing import StartupTimer
+from controls import InputQueue
+from score_history import ScoreHistory
+from telemetry import AI_DEATH, AI_PICKUP, DEATH, PICKUP, RUN_START, cause_code, telemetry
+from simulation_thread import SimulationThread, StateBuffer, capture_state
+from simulation.distance_field import DistanceField
+from savestate import quick_load, quick_save
+from replay import REPLAY_FILE, Recorder
+from particles import DEBRIS, DUST, GLINT, SPARK, particles
+from quality import QualityGovernor
+from fog import FogOfWar
+from event_bus import (
+    CoalCollected,
+    DirectionChanged,
+    PowerUpCollected,
+    RunStarted,
+    TrainDied,
+    bus,
+)
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, history=None):
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         self.clock = pygame.time.Clock()
+        self.quality = QualityGovernor()
+        self.quality.add_listener(self.apply_quality)
+        self.fog = FogOfWar((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.hud = None
+        self.hud_score = 0
+        self.hud_stale = True
+        self.hud_frames = 0
+        self.show_diagnostics = False
+        self.diagnostics_label = Label("", get_font(24), center=(SCREEN_WIDTH - 170, 20))
         self.train = Train()
         self.coal = Coal()
-        self.collapse = Collapse()
-        self.event_scheduler = EventScheduler(10)
-        self.event_scheduler.add_event(self.collapse)
-        self.paused = False
-        self.pause_menu = None
-        self.options_menu = None
-        self.you_died_menu = None
-        self.main_menu = MainMenu(callback=self.handle_main_menu_selection)
-        self.in_main_menu = True
-        self.is_multiplayer = False
-        self.ai_train = None
+        # Kept across ticks and runs; each update only repairs what changed
+        self.coal_field = DistanceField()
+        self.input_queue = InputQueue()
+        self.main_menu = None
         self.difficulty = load_difficulty()
-        self.tutorial_mode = is_first_time()
-        self.tutorial_step = 0
-        self.key_pressed_after_completion = False
-        self.world_powerups = []
-
-        self.coal.spawn_random(3)
-
-        self.powerup_images = {
-            PowerUpType.SPEED_BOOST: pygame.image.load(
-                "assets/speedup.png"
-            ).convert_alpha(),
-            PowerUpType.TORCH: pygame.image.load(
-                "assets/torch.png"
-            ).convert_alpha(),
+        self.tutorial_pending = is_first_time()
+        # Held by the simulation thread for each tick and by the main thread
+        # while it handles input, so menus never change state mid-tick
+        self.lock = threading.RLock()
+        self.simulation = None
+        self.quitting = False
+        self.history = history if history is not None else ScoreHistory()
+        self.seed = None
+        self.run_started = 0
+        # Menus are built once and reopened; each one caches its own frame
+        self.menus = {
+            "main": MainMenu(callback=self.handle_main_menu_selection),
+            "pause": Menu(
+                "Pause Menu",
+                ["Resume", "Options", "Main Menu", "Quit Game"],
+                self.handle_pause_menu_selection,
+            ),
+            "options": Menu(
+                "Options", ["Difficulty", "Back"], self.handle_options_menu_selection
+            ),
+            "credits": Menu(
+                "Credits",
+                [
+                    "Tadej Sev\u0161ek",
+                    "Danijel Tomi\u010d",
+                    "Tilen Ga\u0161pari\u010d",
+                    "Back",
+                ],
+                self.handle_credits_selection,
+            ),
+            "leaderboard": Menu("Leaderboard", ["Back"], self.handle_credits_selection),
         }
+        self.tutorial_label = Label(
+            "", get_font(36), center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT * 0.3)
+        )
+        self.tutorial_view = View((SCREEN_WIDTH, SCREEN_HEIGHT), 128, [self.tutorial_label])
+        self.reset_state()
+
+        # Gameplay assets are loaded between menu frames, see AssetPreloader
+        self.preloader = AssetPreloader()
+        self.preloader.add_defaults()
+        self.floor_seed = random.randrange(2**31)
         self.floor_image = self.set_floor_image()
 
+        # Each step is completed by the first event of its type from the player
         self.tutorial_steps = [
             {
                 "message": "Welcome to Perkmandelc! Use the arrow keys to move.",
-                "condition": self.check_movement,
+                "event": DirectionChanged,
             },
             {
                 "message": "Be careful! Don't hit the walls or yourself. (Please try to kill yourself...to progress in the tutorial)",
-                "condition": self.check_wall_collision,
+                "event": TrainDied,
             },
             {
                 "message": "You did it! Now Collect coals to get more carts and score points.",
-                "condition": self.check_apple_eaten,
+                "event": CoalCollected,
             },
         ]
 
@@ -73,37 +122,104 @@ class Game:
             self.tutorial_steps.append(
                 {
                     "message": "Great job! You're ready to play. but be careful you are not on your own.",
-                    "condition": self.check_key_press_after_completion,
+                    "event": DirectionChanged,
                 }
             )
         else:
             self.tutorial_steps.append(
                 {
                     "message": "Great job! You're ready to play. but you won't be alone.",
-                    "condition": self.check_key_press_after_completion,
+                    "event": DirectionChanged,
                 }
             )
+        for event_type in (DirectionChanged, TrainDied, CoalCollected):
+            bus.subscribe(event_type, self.advance_tutorial)
+        bus.subscribe(CoalCollected, self.on_coal_collected)
+        bus.subscribe(RunStarted, self.on_run_started)
+        self.states = StateBuffer(capture_state(self, 0))
+
+    def reset_state(self):
+        # Only simulation state is reset; the display, assets and floor are kept
+        self.train.reset()
+        self.input_queue.clear()
+        self.coal.clear()
+        particles.clear()
+        self.collapse = Collapse()
+        self.event_scheduler = EventScheduler(10)
+        self.event_scheduler.add_event(self.collapse)
+        self.paused = False
+        self.pause_menu = None
+        self.options_menu = None
+        self.you_died_menu = None
+        self.main_menu = self.open_menu("main")
+        self.in_main_menu = True
+        self.recorder = None
+        self.is_multiplayer = False
+        self.ai_train = None
+        self.tutorial_mode = self.tutorial_pending
+        self.tutorial_step = 0
+        self.world_powerups = []
 
+        self.coal.spawn_random(3)
+
+    def publish_state(self, tick=0):
+        self.states.publish(capture_state(self, tick))
+
+    def advance_tutorial(self, event):
+        if not self.tutorial_mode or getattr(event, "by_ai", False):
+            return
+        if type(event) is not self.tutorial_steps[self.tutorial_step]["event"]:
+            return
+        self.tutorial_step += 1
+        if self.tutorial_step >= len(self.tutorial_steps):
+            self.finish_tutorial()
+        elif self.tutorial_step == len(self.tutorial_steps) - 1:
+            # The train waits on the last message until the next key press
+            self.train.direction = Vector2(0, 0)
+
+    def quit_game(self):
+        # Called with the lock held; main() shuts down once it is released,
+        # so the simulation thread can finish its tick and be joined
+        self.quitting = True
+
+    def shutdown(self):
+        if self.simulation:
+            self.simulation.stop()
+        self.history.close()
+        telemetry.close()
+        pygame.quit()
+        sys.exit()
+
+    def finish_tutorial(self):
+        self.tutorial_mode = False
+        self.tutorial_pending = False
+        mark_tutorial_done()
 
-        
     def set_floor_image(self):
-        floor_images = []
-        for i in range(1, 5):
-            image = pygame.image.load(f"assets/floor{i}.png").convert_alpha()
-            image = pygame.transform.scale(image, (CELL_SIZE, CELL_SIZE // 2))
-            floor_images.append(image)
         surface = pygame.Surface(((CELL_COUNT*CELL_SIZE), (CELL_COUNT*CELL_SIZE)), pygame.SRCALPHA)
-        for row in range(CELL_COUNT):
-            for col in range(CELL_COUNT):
-                img = random.choice(floor_images)
-                surface.blit(img, (col*CELL_SIZE, row * CELL_SIZE //2))
+        self.preloader.add(build_floor_rows(surface, self.floor_seed))
         return surface
+
+    def rebuild_floor(self, seed):
+        # Used when a saved state or replay brings its own floor
+        if seed == self.floor_seed:
+            return
+        surface = pygame.Surface(((CELL_COUNT*CELL_SIZE), (CELL_COUNT*CELL_SIZE)), pygame.SRCALPHA)
+        for _ in build_floor_rows(surface, seed):
+            pass
+        self.floor_seed = seed
+        self.floor_image = surface
+
+    def wait_until_ready(self):
+        # Starting a game needs every asset, so finish whatever is left
+        if not self.preloader.ready:
+            self.preloader.finish()
     
-    def draw_fog_of_war(self):
-        fog_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        fog_surface.fill((0, 0, 0, 245))  # Mostly dark
+    def apply_quality(self, settings):
+        particles.density = settings.particle_density
 
-        if self.difficulty == "Easy" or self.train.fog_disabled:
+    def draw_fog_of_war(self, state):
+        if self.difficulty == "Easy" or state.fog_disabled:
             return
 
         radius = {"Easy": 200, "Medium": 120, "Hard": 60}.get(self.difficulty, 120)
@@ -114,16 +230,13 @@ class Game:
             y = int(pos.y * CELL_SIZE // 2 + offset_y - CELL_SIZE // 2)
             return (x + CELL_SIZE // 2, y + CELL_SIZE // 2)  # center of tile
 
-        # Player spotlight
-        center = grid_to_screen(self.train.body[0])
-        pygame.draw.circle(fog_surface, (0, 0, 0, 0), center, radius)
-
-        # AI spotlight (if multiplayer)
-        if self.is_multiplayer and self.ai_train and self.ai_train.alive:
-            ai_center = grid_to_screen(self.ai_train.body[0])
-            pygame.draw.circle(fog_surface, (0, 0, 0, 0), ai_center, radius)
+        # Player spotlight, plus the AI one in multiplayer
+        centers = [grid_to_screen(state.player_body[0])]
+        if self.is_multiplayer and state.ai_body:
+            centers.append(grid_to_screen(state.ai_body[0]))
 
-        self.screen.blit(fog_surface, (0, 0))
+        settings = self.quality.settings
+        self.fog.draw(self.screen, centers, radius, settings.soft_fog, settings.opaque_fog)
 
     def get_safe_ai_spawn(self):
         safe_margin = 8
@@ -142,15 +255,23 @@ class Game:
         y = max(y, margin)
         y = min(y, CELL_COUNT - 1 - margin)
         pos = Vector2(x, y)
-        # ptype = random.choice(list(self.powerup_images.keys()))
+        # ptype = random.choice(list(POWERUP_IMAGES.keys()))
         ptype = PowerUpType.TORCH
-        image = self.powerup_images[ptype]
+        image = get_image(POWERUP_IMAGES[ptype])
         self.world_powerups.append(PowerUpEntity(ptype, pos, image))
+        if self.recorder:
+            self.recorder.spawn_powerup()
 
     def update(self):
         if self.paused or self.in_main_menu or self.you_died_menu:
             return
 
+        direction = self.input_queue.next_direction(self.train.direction)
+        if self.recorder:
+            self.recorder.tick(self, direction)
+        if direction is not None:
+            self.train.direction = direction
+            bus.publish(DirectionChanged(direction))
         self.train.update()
         self.check_collision()
         self.event_scheduler.check_events(self)
@@ -160,10 +281,25 @@ class Game:
         if self.is_multiplayer and self.ai_train:
             if self.ai_train.alive:
                 avoid = self.train.body
-                self.ai_train.update_ai(self.coal.positions, avoid, self.coal)
+                self.coal_field.update(self.coal.positions, avoid + self.ai_train.body)
+                self.ai_train.update_ai(
+                    self.coal.positions, avoid, self.coal, self.coal_field, self.train.direction
+                )
             elif self.ai_train.ready_to_respawn():
                 spawn = self.get_safe_ai_spawn()
-                self.ai_train = AITrain(position=spawn)
+                self.ai_train.reset(position=spawn)
+
+        telemetry.tick(self.train.body[0], len(self.train.body))
+
+    def draw_frame(self):
+        self.screen.fill(SKY_COLOR)
+        if self.in_main_menu:
+            self.screen.fill((0, 0, 0))
+        elif self.you_died_menu:
+            self.screen.fill((255, 0, 0))
+        self.draw_elements()
+        if self.show_diagnostics:
+            self.draw_diagnostics()
 
     def draw_elements(self):
         if self.in_main_menu:
@@ -171,35 +307,42 @@ class Game:
                 self.screen, SCREEN_WIDTH, SCREEN_HEIGHT
             )
         elif self.you_died_menu:
+            particles.draw(self.screen)
             self.you_died_menu.draw(self.screen, SCREEN_WIDTH, SCREEN_HEIGHT)
         else:
+            # Gameplay is drawn from the last published snapshot, never from
+            # the objects the simulation thread is updating
+            state = self.states.read()
             self.draw_sky_and_ground()
-            self.coal.draw(self.screen)
-            self.train.draw(self.screen)
-            if self.ai_train and self.ai_train.alive:
-                self.ai_train.draw(self.screen)
-            for powerup in self.world_powerups:
+            self.coal.draw(self.screen, state.coal)
+            self.train.draw(self.screen, state.player_body, state.player_direction)
+            if state.ai_body and self.ai_train:
+                self.ai_train.draw(self.screen, state.ai_body, state.ai_direction)
+            for powerup in state.powerups:
                 powerup.draw(self.screen)
-            self.draw_fog_of_war()
+            self.draw_fog_of_war(state)
+            particles.draw(self.screen)
             if self.paused:
                 (self.options_menu or self.pause_menu).draw(
                     self.screen, SCREEN_WIDTH, SCREEN_HEIGHT
                 )
-            if self.tutorial_mode and not self.paused:
-                self.draw_tutorial_message()
-            self.draw_score()
+            if state.tutorial_message and not self.paused:
+                self.draw_tutorial_message(state.tutorial_message)
+            self.draw_score(state)
 
     def check_collision(self):
         # --- Player picks up coal ---
         if self.coal.check_pickup(self.train.body[0]):
             self.train.grow()
             self.coal.spawn_random(2)
+            bus.publish(CoalCollected(self.train.body[0], False, len(self.train.body) - 2))
 
         # --- AI picks up coal ---
         if self.ai_train and self.ai_train.alive:
             if self.coal.check_pickup(self.ai_train.body[0]):
                 self.ai_train.grow()
                 self.coal.spawn_random()
+                bus.publish(CoalCollected(self.ai_train.body[0], True, len(self.ai_train.body) - 2))
 
         # --- Remove coal from train body (cleanup) ---
         for block in self.train.body[1:]:
@@ -212,6 +355,7 @@ class Game:
             if pu.pos == self.train.body[0]:
                 self.train.collect_powerup(pu.type)
                 self.world_powerups.remove(pu)
+                bus.publish(PowerUpCollected(pu.pos, pu.type))
                 break
 
         # --- Player ↔ AI collision (Slither.io logic) ---
@@ -223,59 +367,90 @@ class Game:
 
             # AI head hits player body → AI dies
             if ai_head in player_body:
-                self.ai_train.die()
+                self.ai_train.die(cause="player collision")
 
             # Player head hits AI body → player dies
             elif player_head in ai_body:
-                self.game_over()
+                self.game_over("hit AI train")
 
             # Head-on collision (optional: both die)
             elif ai_head == player_head:
-                print("Head-on collision!")
-                self.game_over()
-                self.ai_train.die()
+                self.game_over("head-on collision")
+                self.ai_train.die(cause="head-on collision")
 
     def check_fail(self):
         head = self.train.body[0]
         if head.x < 0 or head.x >= CELL_COUNT or head.y < 0 or head.y >= CELL_COUNT:
-            self.game_over()
+            self.game_over("wall")
         if head in self.train.body[1:] and self.train.direction != Vector2(0, 0):
-            self.game_over()
+            self.game_over("self collision")
 
-    def game_over(self):
-        crash_sound = pygame.mixer.Sound("assets/sounds/crash.mp3")
-        crash_sound.set_volume(0.3)
-        crash_sound.play()
+    def game_over(self, cause="unknown"):
+        if self.you_died_menu:
+            return  # already dead this tick
         score = len(self.train.body) - 3
+        self.history.record_run(
+            score,
+            pygame.time.get_ticks() - self.run_started,
+            self.difficulty,
+            "Multiplayer" if self.is_multiplayer else "Singleplayer",
+            cause,
+            self.seed,
+        )
         self.you_died_menu = YouDiedMenu(
             callback=self.handle_you_died_menu_selection, current_score=score
         )
+        bus.publish(TrainDied(self.train.body[0], cause, False, score))
+        if self.recorder:
+            self.recorder.save(REPLAY_FILE)
+
+    def start_run(self):
+        # Each run gets its own seed so it can be recorded and replayed
+        self.seed = random.randrange(2**31)
+        random.seed(self.seed)
+        self.run_started = pygame.time.get_ticks()
+        self.recorder = Recorder()
+        self.coal.clear()
+        self.coal.spawn_random(3)
+        bus.publish(RunStarted(self.seed))
 
     def handle_main_menu_selection(self, option):
         if option == "Start Singleplayer":
+            self.wait_until_ready()
+            self.start_run()
             self.in_main_menu = False
             self.ai_train = None
         elif option == "Start Multiplayer":
+            self.wait_until_ready()
+            self.start_run()
             self.in_main_menu = False
             self.is_multiplayer = True
             spawn = self.get_safe_ai_spawn()
             if self.ai_train:
                 self.ai_train.reset()
             else:
-                self.ai_train = AITrain(position=spawn)
+                self.ai_train = self.make_ai_train(spawn)
+        elif option == "Leaderboard":
+            self.show_leaderboard()
         elif option == "Credits":
             self.show_credits()
         elif option == "Options":
             self.show_options_menu()
         elif option == "Quit Game":
-            pygame.quit()
-            sys.exit()
+            self.quit_game()
+
+    def make_ai_train(self, spawn):
+        # Hard opponents plan ahead, the others keep the greedy steering
+        if self.difficulty == "Hard":
+            return SearchAITrain(position=spawn)
+        return AITrain(position=spawn)
 
     def handle_you_died_menu_selection(self, option):
         if option == "Retry":
             self.train.reset()
-            self.coal.clear()
-            self.coal.spawn_random(3)
+            self.input_queue.clear()
+            particles.clear()
+            self.start_run()
             self.world_powerups.clear()
             self.you_died_menu = None
 
@@ -285,73 +460,70 @@ class Game:
             self.return_to_main_menu()
 
     def return_to_main_menu(self):
-        self.__init__()
+        self.reset_state()
 
     def draw_sky_and_ground(self):
         pygame.draw.rect(self.screen, SKY_COLOR, (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
-        bg_image = pygame.image.load("assets/background.png").convert()
-        bg_image = pygame.transform.scale(bg_image, (SCREEN_WIDTH, SCREEN_HEIGHT - (CELL_COUNT * CELL_SIZE // 2)))
-        self.screen.blit(bg_image, (0, 0))
+        self.screen.blit(get_image("background"), (0, 0))
         floor_surface = self.floor_image
         x = 0
-        y = SCREEN_HEIGHT - (CELL_COUNT * CELL_SIZE // 2)
+        y = SCREEN_HEIGHT - FLOOR_HEIGHT
         self.screen.blit(floor_surface, (x, y))
 
-    def draw_score(self):
-        score_text = f"Score: {len(self.train.body) - 3}"
-        surface = pygame.font.Font(None, 25).render(score_text, True, (56, 74, 12))
-        rect = surface.get_rect(topleft=(SCREEN_WIDTH * 0.05, SCREEN_HEIGHT * 0.05))
-        pygame.draw.rect(self.screen, (167, 209, 61), rect.inflate(10, 10))
-        self.screen.blit(surface, rect)
-        pygame.draw.rect(self.screen, (56, 74, 12), rect.inflate(10, 10), 2)
-
-    def draw_tutorial_message(self):
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
-        font = pygame.font.Font(None, 36)
-        text = font.render(
-            self.tutorial_steps[self.tutorial_step]["message"], True, (255, 255, 255)
-        )
-        rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT * 0.3))
-        self.screen.blit(text, rect)
-
-    def check_movement(self):
-        return self.train.direction != Vector2(0, 0)
+    def on_coal_collected(self, event):
+        if not event.by_ai:
+            self.show_score(event.score)
 
-    def check_wall_collision(self):
-        head = self.train.body[0]
-        return (
-            head.x == 0
-            or head.x == CELL_COUNT - 1
-            or head.y == 0
-            or head.y == CELL_COUNT - 1
-        )
+    def on_run_started(self, event):
+        self.show_score(0)
 
-    def check_apple_eaten(self):
-        return len(self.train.body) > 3
+    def show_score(self, score):
+        self.hud_score = score
+        self.hud_stale = True
 
-    def check_key_press_after_completion(self):
-        self.train.direction = Vector2(0, 0)
-        return self.key_pressed_after_completion
+    def draw_score(self, state):
+        # The badge is only rebuilt after show_score, and at lower quality
+        # no more often than every hud_interval frames
+        self.hud_frames += 1
+        if self.hud is None or (
+            self.hud_stale and self.hud_frames >= self.quality.settings.hud_interval
+        ):
+            score_text = f"Score: {self.hud_score}"
+            text = get_font(25).render(score_text, True, (56, 74, 12))
+            badge = pygame.Surface(text.get_rect().inflate(10, 10).size)
+            badge.fill((167, 209, 61))
+            badge.blit(text, (5, 5))
+            pygame.draw.rect(badge, (56, 74, 12), badge.get_rect(), 2)
+            self.hud = badge
+            self.hud_stale = False
+            self.hud_frames = 0
+        self.screen.blit(self.hud, (SCREEN_WIDTH * 0.05 - 5, SCREEN_HEIGHT * 0.05 - 5))
+
+    def draw_diagnostics(self):
+        self.diagnostics_label.set_text(self.quality.describe())
+        self.diagnostics_label.draw(self.screen)
+
+    def draw_tutorial_message(self, message):
+        # Re-rendered only when the step changes
+        self.tutorial_label.set_text(message)
+        self.tutorial_view.draw(self.screen)
+
+    def open_menu(self, name):
+        # Reopened menus start at the first option, like freshly built ones
+        menu = self.menus[name]
+        menu.selected_option = 0
+        return menu
 
     def toggle_pause(self):
         self.paused = not self.paused
         if self.paused:
-            self.pause_menu = Menu(
-                "Pause Menu",
-                ["Resume", "Options", "Main Menu", "Quit Game"],
-                self.handle_pause_menu_selection,
-            )
+            self.pause_menu = self.open_menu("pause")
         else:
             self.pause_menu = None
 
     def show_options_menu(self):
-        self.options_menu = Menu(
-            "Options",
-            ["Difficulty: " + self.difficulty, "Back"],
-            self.handle_options_menu_selection,
-        )
+        self.options_menu = self.open_menu("options")
+        self.options_menu.set_option(0, "Difficulty: " + self.difficulty)
         self.pause_menu = None
         self.main_menu = None
 
@@ -360,36 +532,30 @@ class Game:
             difficulties = ["Easy", "Medium", "Hard"]
             i = difficulties.index(self.difficulty)
             self.difficulty = difficulties[(i + 1) % len(difficulties)]
-            self.options_menu.options[0] = "Difficulty: " + self.difficulty
+            self.options_menu.set_option(0, "Difficulty: " + self.difficulty)
             save_difficulty(self.difficulty)
         elif option == "Back":
-            self.pause_menu = (
-                Menu(
-                    "Pause Menu",
-                    ["Resume", "Options", "Main Menu", "Quit Game"],
-                    self.handle_pause_menu_selection,
-                )
-                if self.paused
-                else None
-            )
-            self.main_menu = MainMenu(callback=self.handle_main_menu_selection)
+            self.pause_menu = self.open_menu("pause") if self.paused else None
+            self.main_menu = self.open_menu("main")
             self.options_menu = None
 
     def show_credits(self):
-        self.main_menu = Menu(
-            "Credits",
-            [
-                "Tadej Sev\u0161ek",
-                "Danijel Tomi\u010d",
-                "Tilen Ga\u0161pari\u010d",
-                "Back",
-            ],
-            self.handle_credits_selection,
-        )
+        self.main_menu = self.open_menu("credits")
+
+    def show_leaderboard(self):
+        runs = self.history.top(difficulty=self.difficulty)
+        lines = [
+            f"{i}. {score}  ({mode}, {duration_ms // 1000}s, {cause})"
+            for i, (score, duration_ms, _, mode, cause) in enumerate(runs, start=1)
+        ]
+        leaderboard = self.menus["leaderboard"]
+        leaderboard.set_title(f"Leaderboard - {self.difficulty}")
+        leaderboard.set_options((lines or ["No runs yet"]) + ["Back"])
+        self.main_menu = self.open_menu("leaderboard")
 
     def handle_credits_selection(self, option):
         if option == "Back":
-            self.main_menu = MainMenu(callback=self.handle_main_menu_selection)
+            self.main_menu = self.open_menu("main")
 
     def handle_pause_menu_selection(self, option):
         if option == "Resume":
@@ -399,56 +565,92 @@ class Game:
         elif option == "Main Menu":
             self.return_to_main_menu()
         elif option == "Quit Game":
-            pygame.quit()
-            sys.exit()
-
-
-pygame.time.set_timer(SCREEN_UPDATE, 150)
-main_game = Game()
-
-# Play ambient wind sound on repeat
-pygame.mixer.music.load("assets/sounds/ambient_wind.mp3")
-pygame.mixer.music.set_volume(0.1)
-pygame.mixer.music.play(-1)
-
-while True:
-    if main_game.tutorial_mode:
-        current_step = main_game.tutorial_steps[main_game.tutorial_step]
-        if current_step["condition"]():
-            main_game.tutorial_step += 1
-            if main_game.tutorial_step >= len(main_game.tutorial_steps):
-                main_game.tutorial_mode = False
-                mark_tutorial_done()
-    for event in pygame.event.get():
+            self.quit_game()
+
+
+def start_music():
+    # Ambient wind sound on repeat
+    audio.play_music("assets/sounds/ambient_wind.mp3", 0.1)
+
+
+def play_coal_sound(event):
+    audio.play("plop")
+
+
+def play_crash_sound(event):
+    if not event.by_ai:
+        audio.play("crash")
+
+
+def record_pickup(event):
+    telemetry.record(AI_PICKUP if event.by_ai else PICKUP, event.pos)
+
+
+def record_death(event):
+    telemetry.record(AI_DEATH if event.by_ai else DEATH, event.pos, cause_code(event.cause))
+
+
+def record_run_start(event):
+    telemetry.record(RUN_START, value=event.seed)
+
+
+def emit_pickup_particles(event):
+    if not event.by_ai:
+        particles.emit(SPARK, event.pos)
+    particles.emit(DUST, event.pos)
+
+
+def emit_powerup_particles(event):
+    particles.emit(GLINT, event.pos)
+
+
+def emit_death_particles(event):
+    particles.emit(DEBRIS, event.pos)
+
+
+def subscribe_services():
+    # Sound, telemetry and effects react to game events rather than being
+    # called from the rules; they run on the simulation thread, like before
+    bus.subscribe(CoalCollected, play_coal_sound)
+    bus.subscribe(TrainDied, play_crash_sound)
+    bus.subscribe(CoalCollected, record_pickup)
+    bus.subscribe(TrainDied, record_death)
+    bus.subscribe(RunStarted, record_run_start)
+    subscribe_effects()
+
+
+def subscribe_effects():
+    # Also used on its own by render_replay, which wants no sound or telemetry
+    bus.subscribe(CoalCollected, emit_pickup_particles)
+    bus.subscribe(PowerUpCollected, emit_powerup_particles)
+    bus.subscribe(TrainDied, emit_death_particles)
+
+
+def handle_events(main_game, events):
+    for event in events:
         if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-        if event.type == SCREEN_UPDATE and not (
-            main_game.paused or main_game.in_main_menu or main_game.you_died_menu
-        ):
-            main_game.update()
+            main_game.quit_game()
         if event.type == pygame.KEYDOWN:
             if not (
                 main_game.paused or main_game.in_main_menu or main_game.you_died_menu
             ):
-                d = main_game.train.direction
-                if event.key == pygame.K_UP and d != Vector2(0, 1):
-                    main_game.train.direction = Vector2(0, -1)
-                elif event.key == pygame.K_DOWN and d != Vector2(0, -1):
-                    main_game.train.direction = Vector2(0, 1)
-                elif event.key == pygame.K_LEFT and d != Vector2(1, 0):
-                    main_game.train.direction = Vector2(-1, 0)
-                elif event.key == pygame.K_RIGHT and d != Vector2(-1, 0):
-                    main_game.train.direction = Vector2(1, 0)
-                elif event.key == pygame.K_p:
+                if event.key == pygame.K_p:
                     main_game.spawn_random_powerup()
+                elif event.key == pygame.K_F5:
+                    quick_save(main_game)
+                else:
+                    # Directions are queued and applied one per tick in Game.update
+                    main_game.input_queue.handle_key(event.key)
+            if event.key == pygame.K_F9 and not main_game.paused:
+                main_game.wait_until_ready()
+                if quick_load(main_game):
+                    # A loaded run is recorded from the loaded state on
+                    main_game.recorder = Recorder()
+                continue
             if event.key == pygame.K_ESCAPE:
                 main_game.toggle_pause()
-            if (
-                main_game.tutorial_mode
-                and main_game.tutorial_step == len(main_game.tutorial_steps) - 1
-            ):
-                main_game.key_pressed_after_completion = True
+            if event.key == pygame.K_F3:
+                main_game.show_diagnostics = not main_game.show_diagnostics
 
         if main_game.in_main_menu:
             (main_game.options_menu or main_game.main_menu).handle_input(event)
@@ -457,11 +659,51 @@ while True:
         elif main_game.you_died_menu:
             main_game.you_died_menu.handle_input(event)
 
-    main_game.screen.fill(SKY_COLOR)
-    if main_game.in_main_menu:
-        main_game.screen.fill((0, 0, 0))
-    elif main_game.you_died_menu:
-        main_game.screen.fill((255, 0, 0))
-    main_game.draw_elements()
-    pygame.display.update()
-    main_game.clock.tick(60)
+
+def main():
+    startup = StartupTimer()
+    pygame.init()
+    audio.init()
+    if os.environ.get("PERKMANDLC_TELEMETRY"):
+        # e.g. PERKMANDLC_TELEMETRY=telemetry.bin, or a .jsonl path for text
+        telemetry.enable(os.environ["PERKMANDLC_TELEMETRY"])
+    subscribe_services()
+    main_game = Game()
+    if os.environ.get("PERKMANDLC_QUALITY"):
+        # e.g. PERKMANDLC_QUALITY=3 fixes the level instead of adapting it
+        main_game.quality.pin(int(os.environ["PERKMANDLC_QUALITY"]))
+    main_game.simulation = SimulationThread(main_game)
+    main_game.simulation.start()
+    startup.mark("game created")
+    while True:
+        events = pygame.event.get()
+        if events:
+            with main_game.lock:
+                handle_events(main_game, events)
+                main_game.publish_state(main_game.simulation.tick)
+            if main_game.quitting:
+                main_game.shutdown()
+
+        if not (main_game.paused or main_game.in_main_menu):
+            particles.update(main_game.clock.get_time())
+        main_game.draw_frame()
+        pygame.display.update()
+        audio.flush()
+
+        if not startup.has("first frame"):
+            startup.mark("first frame")
+            start_music()
+        elif not main_game.preloader.ready:
+            main_game.preloader.step()
+        elif not startup.reported:
+            startup.mark("assets ready")
+            startup.report()
+
+        main_game.clock.tick(60)
+        if not (main_game.in_main_menu or main_game.paused):
+            # Only gameplay frames count; get_rawtime leaves out the tick delay
+            main_game.quality.frame(main_game.clock.get_rawtime())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,71 @@
-import pygame
+from ui import Label, OptionList, View, get_font
 from utils import load_high_score, save_high_score
 
 
 class Menu:
+    # Widgets are built once and laid out on the first draw; the frame is
+    # cached by a View and only recomposed when the selection or text changes
+    overlay_alpha = 224
+
     def __init__(self, title, options, callback):
-        self.title = title
-        self.options = options
         self.callback = callback
-        self.selected_option = 0
-        self.font = pygame.font.Font(None, 36)
-        self.title_font = pygame.font.Font(None, 72)
+        self.font = get_font(36)
+        self.title_font = get_font(72)
+        self.title_label = Label(title, self.title_font)
+        self.option_list = OptionList(options, self.handle_option, self.font)
+        self.view = None
+
+    @property
+    def title(self):
+        return self.title_label.text
+
+    @property
+    def options(self):
+        return self.option_list.options
+
+    @property
+    def selected_option(self):
+        return self.option_list.focus
+
+    @selected_option.setter
+    def selected_option(self, index):
+        self.option_list.set_focus(index)
+
+    def set_title(self, title):
+        self.title_label.set_text(title)
+
+    def set_option(self, index, text):
+        self.option_list.set_option(index, text)
+
+    def set_options(self, options):
+        self.option_list.set_options(options)
+
+    def layout(self, screen_width, screen_height):
+        self.title_label.move_to((screen_width // 2, screen_height // 3))
+        self.option_list.place(screen_width // 2, screen_height // 2)
+        return [self.title_label, self.option_list]
 
     def draw(self, screen, screen_width, screen_height):
-        overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 224))
-        screen.blit(overlay, (0, 0))
-
-        title_text = self.title_font.render(self.title, True, (255, 255, 255))
-        title_rect = title_text.get_rect(center=(screen_width // 2, screen_height // 3))
-        screen.blit(title_text, title_rect)
-
-        for i, option in enumerate(self.options):
-            color = (255, 255, 255) if i == self.selected_option else (150, 150, 150)
-            option_text = self.font.render(option, True, color)
-            option_rect = option_text.get_rect(
-                center=(screen_width // 2, screen_height // 2 + i * 50)
-            )
-            screen.blit(option_text, option_rect)
+        if self.view is None or self.view.size != (screen_width, screen_height):
+            widgets = self.layout(screen_width, screen_height)
+            self.view = View((screen_width, screen_height), self.overlay_alpha, widgets)
+        self.view.draw(screen)
 
     def handle_input(self, event):
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_UP:
-                self.selected_option = (self.selected_option - 1) % len(self.options)
-            elif event.key == pygame.K_DOWN:
-                self.selected_option = (self.selected_option + 1) % len(self.options)
-            elif event.key == pygame.K_RETURN:
-                self.handle_selection()
+        self.option_list.handle_input(event)
 
     def handle_selection(self):
-        selected_option = self.options[self.selected_option]
-        self.callback(selected_option)
+        self.option_list.activate()
+
+    def handle_option(self, option):
+        self.callback(option)
 
 
 class MainMenu(Menu):
     def __init__(self, callback):
         super().__init__(
             title="Train Game",
-            options=["Start Singleplayer", "Start Multiplayer" ,"Credits", "Options", "Quit Game"],
+            options=["Start Singleplayer", "Start Multiplayer", "Leaderboard", "Credits", "Options", "Quit Game"],
             callback=callback,
         )
 
@@ -66,12 +85,14 @@ class OptionsMenu(Menu):
             difficulties = ["Easy", "Medium", "Hard"]
             current_index = difficulties.index(self.difficulty)
             self.difficulty = difficulties[(current_index + 1) % len(difficulties)]
-            self.options[0] = "Difficulty: " + self.difficulty
+            self.set_option(0, "Difficulty: " + self.difficulty)
         elif option == "Back":
             self.parent_callback("Back")
 
 
 class YouDiedMenu(Menu):
+    overlay_alpha = 128
+
     def __init__(self, callback, current_score):
         self.high_score = load_high_score()
         if current_score > self.high_score:
@@ -81,43 +102,16 @@ class YouDiedMenu(Menu):
         super().__init__(
             title="You Died", options=["Retry", "Main Menu"], callback=callback
         )
+        self.high_score_label = Label(f"High Score: {self.high_score}", self.font)
+        self.score_label = Label(f"Score: {self.current_score}", self.font)
 
-    def draw(self, screen, screen_width, screen_height):
-        overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        screen.blit(overlay, (0, 0))
-
-        title_font = pygame.font.Font(None, 72)
-        title_text = title_font.render(self.title, True, (255, 255, 255))
-        title_rect = title_text.get_rect(
-            center=(screen_width // 2, screen_height * 0.3)
-        )
-        screen.blit(title_text, title_rect)
-
+    def layout(self, screen_width, screen_height):
         text_spacing = screen_height * 0.05
-
-        font = pygame.font.Font(None, 36)
-        high_score_text = f"High Score: {self.high_score}"
-        high_score_surface = font.render(high_score_text, True, (255, 255, 255))
-        high_score_rect = high_score_surface.get_rect(
-            center=(screen_width // 2, screen_height * 0.4)
-        )
-        screen.blit(high_score_surface, high_score_rect)
-
-        current_score_text = f"Score: {self.current_score}"
-        current_score_surface = font.render(current_score_text, True, (255, 255, 255))
-        current_score_rect = current_score_surface.get_rect(
-            center=(screen_width // 2, screen_height * 0.4 + text_spacing)
-        )
-        screen.blit(current_score_surface, current_score_rect)
-
-        for i, option in enumerate(self.options):
-            color = (255, 255, 255) if i == self.selected_option else (150, 150, 150)
-            option_text = font.render(option, True, color)
-            option_rect = option_text.get_rect(
-                center=(screen_width // 2, screen_height * 0.6 + i * 50)
-            )
-            screen.blit(option_text, option_rect)
+        self.title_label.move_to((screen_width // 2, screen_height * 0.3))
+        self.high_score_label.move_to((screen_width // 2, screen_height * 0.4))
+        self.score_label.move_to((screen_width // 2, screen_height * 0.4 + text_spacing))
+        self.option_list.place(screen_width // 2, screen_height * 0.6)
+        return [self.title_label, self.high_score_label, self.score_label, self.option_list]
 
 
 class PauseMenu(Menu):
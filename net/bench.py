@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import random
+import time
+from net.client import GameClient
+from net.protocol import OPPOSITE, to_cell
+from net.server import GameServer
+
+
+async def bot(client, stop):
+    # Turns at random like a restless player, never straight back
+    while not stop.is_set():
+        await asyncio.sleep(client.tick_ms / 1000 * random.uniform(1, 3))
+        current = client.predicted_direction()
+        choices = [code for code in (1, 2, 3, 4) if code != OPPOSITE[current]]
+        client.send_direction(random.choice(choices))
+
+
+async def run(num_clients, ticks, tick_ms):
+    server = await GameServer(port=0, tick_ms=tick_ms).start()
+    clients = []
+    for _ in range(num_clients):
+        client = GameClient(tick_ms=tick_ms)
+        await client.connect(port=server.port)
+        clients.append(client)
+
+    stop = asyncio.Event()
+    tasks = [asyncio.create_task(client.run()) for client in clients]
+    tasks += [asyncio.create_task(bot(client, stop)) for client in clients]
+
+    step_times = []
+    world_step = server.world.step
+
+    def timed_step():
+        start = time.perf_counter()
+        delta = world_step()
+        step_times.append(time.perf_counter() - start)
+        return delta
+
+    server.world.step = timed_step
+    await server.run_ticks(ticks)
+    stop.set()
+    await asyncio.sleep(tick_ms / 1000)
+
+    # Every replica should match the authoritative state once deltas drain
+    expected = {
+        pid: [to_cell(block) for block in player.train.body]
+        for pid, player in server.world.players.items()
+        if player.alive
+    }
+    coal = sorted(to_cell(pos) for pos in server.world.coal.positions)
+    in_sync = all(
+        {pid: list(body) for pid, body in client.world.bodies.items()} == expected
+        and sorted(client.world.coal) == coal
+        for client in clients
+    )
+
+    server.close()
+    for client in clients:
+        client.close()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies = sorted(l for client in clients for l in client.latencies)
+    received = sum(client.bytes_received for client in clients)
+    print(f"clients: {num_clients}, ticks: {ticks}, tick: {tick_ms} ms")
+    print(f"server sent:      {server.bytes_sent / ticks:8.1f} bytes/tick")
+    print(f"per client:       {received / num_clients / ticks:8.1f} bytes/tick")
+    print(f"server step:      {sum(step_times) / len(step_times) * 1e6:8.1f} us/tick")
+    if latencies:
+        mean = sum(latencies) / len(latencies) * 1000
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000
+        print(f"input latency:    {mean:8.1f} ms mean, {p95:.1f} ms p95")
+    print(f"replicas in sync: {in_sync}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the multiplayer protocol on localhost.")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--tick-ms", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.clients, args.ticks, args.tick_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections import deque
+from constants import CELL_COUNT
+from net.protocol import (
+    DIRECTIONS,
+    MSG_DELTA,
+    OPPOSITE,
+    WELCOME,
+    TickDelta,
+    encode_input,
+    frame,
+    read_frame,
+)
+
+
+class ClientWorld:
+    """Replicated world state built from the server's tick deltas."""
+
+    def __init__(self):
+        self.tick = 0
+        self.bodies = {}  # player id -> deque of cells, head first
+        self.directions = {}
+        self.coal = []
+
+    def apply(self, delta):
+        self.tick = delta.tick
+        # Spawns first, then moves, then deaths matches the order on the server
+        for pid, direction, cells in delta.spawns:
+            self.bodies[pid] = deque(cells)
+            self.directions[pid] = direction
+        for pid, head, tail_dropped, direction in delta.moves:
+            body = self.bodies.get(pid)
+            if body is None:
+                continue
+            body.appendleft(head)
+            if tail_dropped:
+                body.pop()
+            self.directions[pid] = direction
+        for pid in delta.deaths:
+            self.bodies.pop(pid, None)
+            self.directions.pop(pid, None)
+        self.coal.extend(delta.coal_added)
+        for cell in delta.coal_removed:
+            # A replica out of step with the server, e.g. after a missed
+            # join, may not have the cell; skip it rather than end the client
+            if cell in self.coal:
+                self.coal.remove(cell)
+
+
+class GameClient:
+    def __init__(self, tick_ms=150):
+        self.tick_ms = tick_ms
+        self.world = ClientWorld()
+        self.player_id = None
+        self.reader = None
+        self.writer = None
+        self.seq = 0
+        self.pending = []  # (seq, direction, send time) not yet acked by the server
+        self.last_delta_time = 0
+        self.latencies = []
+        self.bytes_received = 0
+        self.ticks_received = 0
+
+    async def connect(self, host="127.0.0.1", port=5555):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        payload = await read_frame(self.reader)
+        _, self.player_id = WELCOME.unpack(payload)
+        snapshot, _ = TickDelta.decode(await read_frame(self.reader))
+        self.world.apply(snapshot)
+        self.last_delta_time = time.perf_counter()
+
+    def send_direction(self, code):
+        self.seq += 1
+        self.pending.append((self.seq, code, time.perf_counter()))
+        self.writer.write(frame(encode_input(self.seq, code)))
+
+    async def run(self):
+        try:
+            while True:
+                payload = await read_frame(self.reader)
+                self.bytes_received += len(payload) + 2
+                if payload[0] == MSG_DELTA:
+                    self.receive(payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def receive(self, payload):
+        delta, ack_seq = TickDelta.decode(payload)
+        self.world.apply(delta)
+        self.ticks_received += 1
+        now = time.perf_counter()
+        self.last_delta_time = now
+        # Reconcile: the server state is authoritative, drop acknowledged inputs
+        while self.pending and self.pending[0][0] <= ack_seq:
+            _, _, sent = self.pending.pop(0)
+            self.latencies.append(now - sent)
+
+    def predicted_direction(self):
+        current = self.world.directions.get(self.player_id, 0)
+        for _, code, _ in self.pending:
+            if code != OPPOSITE[current]:
+                return code
+        return current
+
+    def predicted_body(self, max_ticks=2):
+        # Advance our own train by the ticks elapsed since the last delta so
+        # input feels immediate; the next delta snaps it back if we guessed wrong
+        body = self.world.bodies.get(self.player_id)
+        if body is None:
+            return None
+        body = list(body)
+        code = self.predicted_direction()
+        if code == 0:
+            return body
+        elapsed_ms = (time.perf_counter() - self.last_delta_time) * 1000
+        steps = min(max_ticks, int(elapsed_ms // self.tick_ms) + (1 if self.pending else 0))
+        step = DIRECTIONS[code]
+        for _ in range(steps):
+            x = body[0] % CELL_COUNT + int(step.x)
+            y = body[0] // CELL_COUNT + int(step.y)
+            if not (0 <= x < CELL_COUNT and 0 <= y < CELL_COUNT):
+                break
+            body = [y * CELL_COUNT + x] + body[:-1]
+        return body
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import sys
+import pygame
+from constants import CELL_COUNT, CELL_SIZE, FPS, SCREEN_HEIGHT, SCREEN_WIDTH, SKY_COLOR
+from assets import FLOOR_HEIGHT, build_floor_rows, get_image
+from entities.coal import Coal
+from entities.train import Train
+from net.client import GameClient
+from net.protocol import DIRECTIONS, from_cell
+from net.server import GameServer
+
+KEY_DIRECTIONS = {
+    pygame.K_UP: 1,
+    pygame.K_DOWN: 2,
+    pygame.K_LEFT: 3,
+    pygame.K_RIGHT: 4,
+}
+
+
+class NetworkGameView:
+    """Draws the replicated world with the regular sprites."""
+
+    def __init__(self, screen, client):
+        self.screen = screen
+        self.client = client
+        self.coal = Coal()
+        self.trains = {}
+        self.floor_image = pygame.Surface((CELL_COUNT * CELL_SIZE, CELL_COUNT * CELL_SIZE), pygame.SRCALPHA)
+        for _ in build_floor_rows(self.floor_image):
+            pass
+
+    def draw(self):
+        world = self.client.world
+        self.screen.fill(SKY_COLOR)
+        self.screen.blit(get_image("background"), (0, 0))
+        self.screen.blit(self.floor_image, (0, SCREEN_HEIGHT - FLOOR_HEIGHT))
+
+        self.coal.positions = [from_cell(cell) for cell in world.coal]
+        self.coal.draw(self.screen)
+
+        for pid in list(self.trains):
+            if pid not in world.bodies:
+                del self.trains[pid]
+        for pid, body in world.bodies.items():
+            train = self.trains.setdefault(pid, Train())
+            if pid == self.client.player_id:
+                body = self.client.predicted_body()
+                train.direction = DIRECTIONS[self.client.predicted_direction()]
+            else:
+                train.direction = DIRECTIONS[world.directions[pid]]
+            train.body = [from_cell(cell) for cell in body]
+            train.draw(self.screen)
+
+        own = world.bodies.get(self.client.player_id)
+        text = f"Score: {len(own) - 3}" if own else "Respawning..."
+        surface = pygame.font.Font(None, 25).render(text, True, (255, 255, 255))
+        self.screen.blit(surface, (SCREEN_WIDTH * 0.05, SCREEN_HEIGHT * 0.05))
+
+
+async def play(host, port, serve):
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    server = None
+    if serve:
+        server = await GameServer(host, port).start()
+        asyncio.create_task(server.run_ticks())
+
+    client = GameClient()
+    await client.connect(host, port)
+    receiver = asyncio.create_task(client.run())
+    view = NetworkGameView(screen, client)
+    loop = asyncio.get_running_loop()
+
+    while not receiver.done():
+        frame_start = loop.time()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                client.close()
+                if server:
+                    server.close()
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN and event.key in KEY_DIRECTIONS:
+                client.send_direction(KEY_DIRECTIONS[event.key])
+        view.draw()
+        pygame.display.update()
+        # Wait out the frame in the event loop rather than in clock.tick(),
+        # so the socket tasks and a --serve server keep running meanwhile
+        await asyncio.sleep(max(0, frame_start + 1 / FPS - loop.time()))
+    print("Disconnected from server.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Join a multiplayer game.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--serve", action="store_true", help="also host the server")
+    args = parser.parse_args()
+    asyncio.run(play(args.host, args.port, args.serve))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import struct
+from pygame.math import Vector2
+from constants import CELL_COUNT
+
+# Messages are length-prefixed little-endian structs. Cells are packed as
+# y * CELL_COUNT + x so a position fits in one unsigned short.
+MSG_INPUT = 1
+MSG_WELCOME = 2
+MSG_DELTA = 3
+
+# Direction codes, index 0 is "standing still"
+DIRECTIONS = [Vector2(0, 0), Vector2(0, -1), Vector2(0, 1), Vector2(-1, 0), Vector2(1, 0)]
+OPPOSITE = {0: 0, 1: 2, 2: 1, 3: 4, 4: 3}
+
+FLAG_TAIL_DROPPED = 1
+
+FRAME_HEADER = struct.Struct("<H")
+INPUT = struct.Struct("<BIB")  # type, seq, direction
+WELCOME = struct.Struct("<BB")  # type, player id
+DELTA_HEADER = struct.Struct("<BII")  # type, tick, last acked input seq
+DELTA_COUNTS = struct.Struct("<BBBHH")  # moves, spawns, deaths, coal added, coal removed
+MOVE = struct.Struct("<BHB")  # player id, new head cell, flags | direction << 1
+SPAWN = struct.Struct("<BBH")  # player id, direction, body length
+
+
+def to_cell(pos):
+    return int(pos.y) * CELL_COUNT + int(pos.x)
+
+
+def from_cell(cell):
+    return Vector2(cell % CELL_COUNT, cell // CELL_COUNT)
+
+
+def direction_code(direction):
+    return DIRECTIONS.index(direction)
+
+
+def frame(payload):
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+async def read_frame(reader):
+    header = await reader.readexactly(FRAME_HEADER.size)
+    (length,) = FRAME_HEADER.unpack(header)
+    return await reader.readexactly(length)
+
+
+def encode_input(seq, direction):
+    return INPUT.pack(MSG_INPUT, seq, direction)
+
+
+def decode_input(payload):
+    _, seq, direction = INPUT.unpack(payload)
+    return seq, direction
+
+
+class TickDelta:
+    """Everything that changed during one server tick."""
+
+    def __init__(self, tick):
+        self.tick = tick
+        self.moves = []  # (player id, head cell, tail dropped, direction)
+        self.spawns = []  # (player id, direction, [cells])
+        self.deaths = []  # player ids
+        self.coal_added = []
+        self.coal_removed = []
+
+    def encode_body(self):
+        # Shared by every client, only the header differs per connection
+        parts = [
+            DELTA_COUNTS.pack(
+                len(self.moves),
+                len(self.spawns),
+                len(self.deaths),
+                len(self.coal_added),
+                len(self.coal_removed),
+            )
+        ]
+        for pid, head, tail_dropped, direction in self.moves:
+            flags = (FLAG_TAIL_DROPPED if tail_dropped else 0) | direction << 1
+            parts.append(MOVE.pack(pid, head, flags))
+        for pid, direction, cells in self.spawns:
+            parts.append(SPAWN.pack(pid, direction, len(cells)))
+            parts.append(struct.pack(f"<{len(cells)}H", *cells))
+        parts.append(struct.pack(f"<{len(self.deaths)}B", *self.deaths))
+        parts.append(struct.pack(f"<{len(self.coal_added)}H", *self.coal_added))
+        parts.append(struct.pack(f"<{len(self.coal_removed)}H", *self.coal_removed))
+        return b"".join(parts)
+
+    def encode(self, ack_seq, body=None):
+        header = DELTA_HEADER.pack(MSG_DELTA, self.tick, ack_seq)
+        return header + (body if body is not None else self.encode_body())
+
+    @classmethod
+    def decode(cls, payload):
+        _, tick, ack_seq = DELTA_HEADER.unpack_from(payload)
+        offset = DELTA_HEADER.size
+        n_moves, n_spawns, n_deaths, n_added, n_removed = DELTA_COUNTS.unpack_from(
+            payload, offset
+        )
+        offset += DELTA_COUNTS.size
+        delta = cls(tick)
+        for _ in range(n_moves):
+            pid, head, flags = MOVE.unpack_from(payload, offset)
+            offset += MOVE.size
+            delta.moves.append((pid, head, bool(flags & FLAG_TAIL_DROPPED), flags >> 1))
+        for _ in range(n_spawns):
+            pid, direction, length = SPAWN.unpack_from(payload, offset)
+            offset += SPAWN.size
+            cells = list(struct.unpack_from(f"<{length}H", payload, offset))
+            offset += 2 * length
+            delta.spawns.append((pid, direction, cells))
+        delta.deaths = list(struct.unpack_from(f"<{n_deaths}B", payload, offset))
+        offset += n_deaths
+        delta.coal_added = list(struct.unpack_from(f"<{n_added}H", payload, offset))
+        offset += 2 * n_added
+        delta.coal_removed = list(struct.unpack_from(f"<{n_removed}H", payload, offset))
+        return delta, ack_seq
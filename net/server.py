@@ -0,0 +1,343 @@
+import argparse
+import asyncio
+import random
+from collections import deque
+from pygame.math import Vector2
+from constants import CELL_COUNT
+from entities.coal import Coal
+from entities.train import Train
+from savestate import WorldTrain, pack_world, unpack_world
+from net.protocol import (
+    DIRECTIONS,
+    OPPOSITE,
+    WELCOME,
+    MSG_WELCOME,
+    TickDelta,
+    decode_input,
+    direction_code,
+    frame,
+    read_frame,
+    to_cell,
+)
+
+TICK_MS = 150
+RESPAWN_TICKS = 33  # roughly the 5 seconds an AI train waits
+MAX_PLAYERS = 255  # player ids are one byte on the wire, 1 to 255
+
+
+def in_bounds(pos):
+    return 0 <= pos.x < CELL_COUNT and 0 <= pos.y < CELL_COUNT
+
+
+class ServerPlayer:
+    def __init__(self, pid):
+        self.pid = pid
+        self.train = Train()
+        self.alive = False
+        self.respawn_tick = 0
+        self.inputs = []  # queued direction codes, one is applied per tick
+        self.last_seq = 0
+
+
+class ServerWorld:
+    """Authoritative multiplayer simulation using the single player rules."""
+
+    def __init__(self):
+        self.players = {}
+        self.coal = Coal()
+        self.tick = 0
+        self.pending = TickDelta(0)
+        # Joins and leaves are applied at the start of the next tick so the
+        # world only ever changes inside step()
+        self.joins = []
+        self.leaves = []
+        # Inputs that arrive before their player's join is applied
+        self.early_inputs = {}
+        self.coal.spawn_random(3)
+
+    def add_player(self, pid):
+        self.joins.append(pid)
+
+    def remove_player(self, pid):
+        self.leaves.append(pid)
+
+    def occupied(self):
+        return [
+            block
+            for player in self.players.values()
+            if player.alive
+            for block in player.train.body
+        ]
+
+    def spawn(self, player):
+        safe_margin = 4
+        taken = self.occupied()
+        start = Vector2(CELL_COUNT // 2, CELL_COUNT // 2)
+        for _ in range(50):
+            x = random.randint(safe_margin + 2, CELL_COUNT - safe_margin - 1)
+            y = random.randint(safe_margin, CELL_COUNT - safe_margin - 1)
+            pos = Vector2(x, y)
+            if all(pos.distance_to(p) > safe_margin for p in taken):
+                start = pos
+                break
+        player.train.reset()
+        player.train.body = [start, start - Vector2(1, 0), start - Vector2(2, 0)]
+        player.alive = True
+        player.inputs.clear()
+        self.pending.spawns.append(
+            (player.pid, 0, [to_cell(block) for block in player.train.body])
+        )
+
+    def kill(self, player):
+        player.alive = False
+        player.respawn_tick = self.tick + RESPAWN_TICKS
+        self.pending.deaths.append(player.pid)
+        # A head that went through the wall does not leave coal behind
+        remains = [block for block in player.train.body if in_bounds(block)]
+        self.coal.spawn_at(remains)
+        self.pending.coal_added.extend(to_cell(block) for block in remains)
+
+    def add_coal(self, count):
+        start = len(self.coal.positions)
+        self.coal.spawn_random(count)
+        self.pending.coal_added.extend(
+            to_cell(pos) for pos in self.coal.positions[start:]
+        )
+
+    def remove_coal(self, pos):
+        self.coal.positions.remove(pos)
+        self.pending.coal_removed.append(to_cell(pos))
+
+    def queue_input(self, pid, seq, code):
+        if not 0 < code < len(DIRECTIONS):
+            return
+        player = self.players.get(pid)
+        if player:
+            player.inputs.append((seq, code))
+        elif pid in self.joins:
+            self.early_inputs.setdefault(pid, []).append((seq, code))
+
+    def step(self):
+        self.tick += 1
+        self.pending.tick = self.tick
+        for pid in self.leaves:
+            player = self.players.pop(pid, None)
+            if player and player.alive:
+                self.pending.deaths.append(pid)
+        for pid in self.joins:
+            early = self.early_inputs.pop(pid, [])
+            if pid not in self.leaves:
+                self.players[pid] = ServerPlayer(pid)
+                self.spawn(self.players[pid])
+                self.players[pid].inputs.extend(early)
+                self.add_coal(1)
+        self.joins.clear()
+        self.leaves.clear()
+
+        alive = [p for p in self.players.values() if p.alive]
+        for player in self.players.values():
+            if not player.alive and player.inputs:
+                # Inputs sent while waiting to respawn are acked and dropped
+                player.last_seq = player.inputs[-1][0]
+                player.inputs.clear()
+
+        for player in alive:
+            train = player.train
+            current = direction_code(train.direction)
+            while player.inputs:
+                seq, code = player.inputs.pop(0)
+                player.last_seq = seq
+                if code != OPPOSITE[current]:
+                    train.direction = DIRECTIONS[code]
+                    break
+            length = len(train.body)
+            train.update()
+            if train.direction != Vector2(0, 0) and in_bounds(train.body[0]):
+                self.pending.moves.append(
+                    (
+                        player.pid,
+                        to_cell(train.body[0]),
+                        len(train.body) == length,
+                        direction_code(train.direction),
+                    )
+                )
+
+        # Coal pickups and cleanup, same as Game.check_collision
+        for player in alive:
+            head = player.train.body[0]
+            if head in self.coal.positions:
+                self.remove_coal(head)
+                player.train.grow()
+                self.add_coal(1)
+            for block in player.train.body[1:]:
+                if block in self.coal.positions:
+                    self.remove_coal(block)
+                    self.add_coal(1)
+
+        # Walls, self collisions and train on train collisions
+        dead = set()
+        for player in alive:
+            head = player.train.body[0]
+            body = player.train.body
+            if not in_bounds(head):
+                dead.add(player.pid)
+            elif head in body[1:] and player.train.direction != Vector2(0, 0):
+                dead.add(player.pid)
+            for other in alive:
+                if other is player:
+                    continue
+                if head in other.train.body[1:] or head == other.train.body[0]:
+                    dead.add(player.pid)
+        for player in alive:
+            if player.pid in dead:
+                self.kill(player)
+
+        for player in self.players.values():
+            if not player.alive and self.tick >= player.respawn_tick:
+                self.spawn(player)
+
+        delta, self.pending = self.pending, TickDelta(self.tick)
+        return delta
+
+    def snapshot(self):
+        delta = TickDelta(self.tick)
+        for player in self.players.values():
+            if player.alive:
+                cells = [to_cell(block) for block in player.train.body]
+                code = direction_code(player.train.direction)
+                delta.spawns.append((player.pid, code, cells))
+        delta.coal_added = [to_cell(pos) for pos in self.coal.positions]
+        return delta
+
+    def save_world(self):
+        trains = [
+            WorldTrain(
+                player.pid,
+                player.train.body,
+                player.train.direction,
+                player.train.add_block_flag,
+                player.alive,
+                player.respawn_tick,
+            )
+            for player in self.players.values()
+        ]
+        return pack_world(self.tick, trains, self.coal.positions)
+
+    def restore_world(self, data):
+        """Rolls the world back to a save_world() state.
+
+        Queued inputs and acks of players that are still connected are kept.
+        Clients only learn about the rollback from a new snapshot().
+        """
+        self.tick, trains, coal = unpack_world(data)
+        players = {}
+        for state in trains:
+            player = self.players.get(state.id) or ServerPlayer(state.id)
+            player.train.reset()
+            player.train.body = [Vector2(cell) for cell in state.cells]
+            player.train.direction = Vector2(state.direction)
+            player.train.add_block_flag = state.grow
+            player.alive = state.alive
+            player.respawn_tick = state.timer
+            players[state.id] = player
+        self.players = players
+        self.coal.positions = [Vector2(cell) for cell in coal]
+        self.pending = TickDelta(self.tick)
+
+
+class GameServer:
+    def __init__(self, host="127.0.0.1", port=5555, tick_ms=TICK_MS):
+        self.host = host
+        self.port = port
+        self.tick_ms = tick_ms
+        self.world = ServerWorld()
+        self.writers = {}
+        # Ids of players that left go back to the end of the queue after the
+        # world has removed them, so a new player never takes over the id of
+        # one clients have not yet seen leave
+        self.free_pids = deque(range(1, MAX_PLAYERS + 1))
+        self.released_pids = []
+        self.bytes_sent = 0
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        await self.start()
+        await self.run_ticks()
+
+    async def run_ticks(self, count=None):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        ticks = 0
+        while count is None or ticks < count:
+            next_tick += self.tick_ms / 1000
+            await asyncio.sleep(max(0, next_tick - loop.time()))
+            await self.broadcast(self.world.step())
+            self.free_pids.extend(self.released_pids)
+            self.released_pids.clear()
+            ticks += 1
+
+    async def broadcast(self, delta):
+        body = delta.encode_body()
+        writers = list(self.writers.items())
+        for pid, writer in writers:
+            player = self.world.players.get(pid)
+            data = frame(delta.encode(player.last_seq if player else 0, body))
+            self.bytes_sent += len(data)
+            writer.write(data)
+        await asyncio.gather(*(self.drain(writer) for _, writer in writers))
+
+    async def drain(self, writer):
+        # A client that cannot take a tick's worth of data within a tick is
+        # dropped rather than buffered for without limit
+        try:
+            await asyncio.wait_for(writer.drain(), self.tick_ms / 1000)
+        except (asyncio.TimeoutError, ConnectionError):
+            writer.close()
+
+    async def handle_client(self, reader, writer):
+        if not self.free_pids:
+            # Server full
+            writer.close()
+            return
+        pid = self.free_pids.popleft()
+        writer.write(frame(WELCOME.pack(MSG_WELCOME, pid)))
+        writer.write(frame(self.world.snapshot().encode(0)))
+        self.world.add_player(pid)
+        self.writers[pid] = writer
+        try:
+            while True:
+                seq, code = decode_input(await read_frame(reader))
+                self.world.queue_input(pid, seq, code)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.writers.pop(pid, None)
+            self.world.remove_player(pid)
+            self.released_pids.append(pid)
+            writer.close()
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+        if self.server:
+            self.server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a multiplayer game server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--tick-ms", type=int, default=TICK_MS)
+    args = parser.parse_args()
+    server = GameServer(args.host, args.port, args.tick_ms)
+    print(f"Serving on {args.host}:{args.port}")
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import math
+import random
+import threading
+import numpy as np
+import pygame
+from constants import CELL_COUNT, CELL_SIZE, SCREEN_HEIGHT
+
+DEFAULT_CAPACITY = 2048
+
+# Effect kinds
+SPARK = 0
+DUST = 1
+GLINT = 2
+DEBRIS = 3
+
+# kind -> (particles per burst, min speed, max speed px/s, lifetime ms,
+#          gravity px/s^2, colors)
+EFFECTS = [
+    (14, 60, 180, 450, 260, [(255, 214, 90), (255, 150, 40), (255, 245, 200)]),
+    (10, 15, 60, 800, -25, [(60, 60, 60), (90, 86, 80), (35, 35, 35)]),
+    (18, 40, 140, 600, 0, [(255, 255, 255), (140, 230, 255), (255, 240, 120)]),
+    (48, 80, 260, 950, 420, [(120, 84, 50), (90, 90, 90), (160, 120, 70), (50, 40, 30)]),
+]
+
+SPRITE_SIZES = [2, 3, 4]  # smallest is used at the end of a particle's life
+
+
+def cell_center(x, y):
+    offset_y = SCREEN_HEIGHT - (CELL_COUNT * CELL_SIZE // 2)
+    return x * CELL_SIZE + CELL_SIZE // 2, y * CELL_SIZE // 2 + offset_y - CELL_SIZE // 4
+
+
+class ParticleSystem:
+    """Fixed pool of particles kept as NumPy columns, one slot per particle.
+
+    emit() only queues a burst, so the simulation thread can call it. The
+    main thread spawns queued bursts in update() and draws every live
+    particle with a single Surface.blits() call. Slots are handed out in
+    ring order, so when the pool is full the oldest particles are recycled.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, np.float32)
+        self.y = np.zeros(capacity, np.float32)
+        self.vx = np.zeros(capacity, np.float32)
+        self.vy = np.zeros(capacity, np.float32)
+        self.life = np.zeros(capacity, np.float32)  # ms left, 0 for a free slot
+        self.ttl = np.zeros(capacity, np.float32)
+        self.kind = np.zeros(capacity, np.uint8)
+        self.sprite = np.zeros(capacity, np.uint8)  # color index
+        self.gravity = np.array([effect[4] for effect in EFFECTS], np.float32)
+        self.next = 0
+        self.used = 0  # slots below this have been written at least once
+        self.density = 1.0  # scales burst sizes, lowered by the quality governor
+        self.queued = []
+        self.lock = threading.Lock()
+        # Own generator so effects never disturb the seeded gameplay random
+        self.rng = random.Random()
+        self.sprites = None
+
+    def emit(self, kind, pos):
+        with self.lock:
+            self.queued.append((kind, pos.x, pos.y))
+
+    def clear(self):
+        with self.lock:
+            self.queued.clear()
+        self.life[: self.used] = 0
+        self.used = 0
+        self.next = 0
+
+    @property
+    def live(self):
+        return int(np.count_nonzero(self.life[: self.used] > 0))
+
+    def __spawn(self, kind, gx, gy):
+        count, min_speed, max_speed, ttl, _, colors = EFFECTS[kind]
+        count = int(count * self.density)
+        if not count:
+            return
+        cx, cy = cell_center(gx, gy)
+        # Drawn from self.rng one particle at a time, in the same order as
+        # always, so a seeded generator gives the same bursts
+        rng = self.rng
+        vx, vy, lifetimes, colors_used = [], [], [], []
+        for _ in range(count):
+            angle = rng.uniform(0, math.tau)
+            speed = rng.uniform(min_speed, max_speed)
+            vx.append(math.cos(angle) * speed)
+            vy.append(math.sin(angle) * speed)
+            lifetimes.append(ttl * rng.uniform(0.6, 1.0))
+            colors_used.append(rng.randrange(len(colors)))
+        slots = (self.next + np.arange(count)) % self.capacity
+        self.x[slots] = cx
+        self.y[slots] = cy
+        self.vx[slots] = vx
+        self.vy[slots] = vy
+        self.life[slots] = lifetimes
+        self.ttl[slots] = lifetimes
+        self.kind[slots] = kind
+        self.sprite[slots] = colors_used
+        self.next = (self.next + count) % self.capacity
+        self.used = min(self.capacity, self.used + count)
+
+    def update(self, dt_ms):
+        with self.lock:
+            queued, self.queued = self.queued, []
+        for kind, gx, gy in queued:
+            self.__spawn(kind, gx, gy)
+
+        # Free slots are stepped too and simply never drawn
+        n = self.used
+        if not n:
+            return
+        life = self.life[:n]
+        if life.max() <= 0:
+            # Everything has burnt out, so the next burst starts at slot 0
+            self.used = self.next = 0
+            return
+        dt = dt_ms / 1000
+        life -= dt_ms
+        self.vy[:n] += self.gravity[self.kind[:n]] * dt
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+
+    def __build_sprites(self):
+        # sprites[kind][color][stage], one small square per size
+        self.sprites = []
+        for effect in EFFECTS:
+            per_color = []
+            for color in effect[5]:
+                stages = []
+                for size in SPRITE_SIZES:
+                    surface = pygame.Surface((size, size))
+                    surface.fill(color)
+                    stages.append(surface)
+                per_color.append(stages)
+            self.sprites.append(per_color)
+
+    def draw(self, screen):
+        if self.sprites is None:
+            self.__build_sprites()
+        sprites = self.sprites
+        stages = len(SPRITE_SIZES)
+        live = np.flatnonzero(self.life[: self.used] > 0)
+        if not live.size:
+            return
+        stage = np.minimum(stages - 1, (stages * self.life[live] / self.ttl[live]).astype(np.intp))
+        batch = [
+            (sprites[k][c][s], (px, py))
+            for k, c, s, px, py in zip(
+                self.kind[live].tolist(),
+                self.sprite[live].tolist(),
+                stage.tolist(),
+                self.x[live].tolist(),
+                self.y[live].tolist(),
+            )
+        ]
+        screen.blits(batch, doreturn=False)
+
+
+particles = ParticleSystem()
@@ -0,0 +1,84 @@
+from collections import deque, namedtuple
+from constants import FPS
+
+# Least visible changes first; every level keeps the savings of the ones above it
+QualityLevel = namedtuple(
+    "QualityLevel",
+    ["name", "soft_fog", "opaque_fog", "particle_density", "hud_interval"],
+)
+
+LEVELS = [
+    QualityLevel("high", True, False, 1.0, 1),
+    QualityLevel("hard fog", False, False, 1.0, 1),
+    QualityLevel("opaque fog", False, True, 1.0, 1),
+    QualityLevel("fewer particles", False, True, 0.35, 1),
+    QualityLevel("slow HUD", False, True, 0.35, 15),
+]
+
+WINDOW = 90  # frames averaged before any decision
+HEADROOM = 0.6  # step back up once frames take less than this share of the budget
+
+
+class QualityGovernor:
+    """Steps rendering quality down when frames run over budget, and back up.
+
+    frame() takes the work time of one frame (not counting the wait in
+    clock.tick). Decisions are made on the average of a full window, which
+    is cleared after every change, so the effect of a step is measured
+    before the next one. Every change is kept in changes as
+    (frame, old level, new level, reason) for diagnostics.
+    """
+
+    def __init__(self, budget_ms=1000 / FPS, window=WINDOW):
+        self.budget_ms = budget_ms
+        self.samples = deque(maxlen=window)
+        self.level = 0
+        self.frames = 0
+        self.pinned = False
+        self.changes = []
+        self.listeners = []
+
+    @property
+    def settings(self):
+        return LEVELS[self.level]
+
+    @property
+    def average_ms(self):
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    def add_listener(self, listener):
+        # Called as listener(settings) after every level change
+        self.listeners.append(listener)
+
+    def pin(self, level):
+        # Fixes the level, e.g. from the command line, and stops adapting
+        self.pinned = True
+        self.set_level(level, "pinned")
+
+    def frame(self, frame_ms):
+        self.frames += 1
+        self.samples.append(frame_ms)
+        if self.pinned or len(self.samples) < self.samples.maxlen:
+            return
+        average = self.average_ms
+        if average > self.budget_ms and self.level < len(LEVELS) - 1:
+            self.set_level(
+                self.level + 1,
+                f"average frame {average:.1f} ms over the {self.budget_ms:.1f} ms budget",
+            )
+        elif average < self.budget_ms * HEADROOM and self.level > 0:
+            self.set_level(
+                self.level - 1,
+                f"average frame {average:.1f} ms leaves headroom in the {self.budget_ms:.1f} ms budget",
+            )
+
+    def set_level(self, level, reason):
+        level = max(0, min(level, len(LEVELS) - 1))
+        self.changes.append((self.frames, self.level, level, reason))
+        self.level = level
+        self.samples.clear()
+        for listener in self.listeners:
+            listener(self.settings)
+
+    def describe(self):
+        return f"Quality {self.level}/{len(LEVELS) - 1} {self.settings.name}, {self.average_ms:.1f} ms"
@@ -0,0 +1,220 @@
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# Frames are drawn offscreen; no window or sound device is needed
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from constants import SCREEN_HEIGHT, SCREEN_WIDTH
+from main import Game, subscribe_effects
+from particles import EFFECTS, particles
+from replay import REPLAY_FILE, read_replay, tick_input
+from savestate import load_state, save_state
+from simulation_thread import TICK_MS
+
+# A chunk starts simulating this many ticks early, so particles emitted just
+# before its first frame are on screen like in an unsplit export
+WARMUP_TICKS = math.ceil(max(effect[3] for effect in EFFECTS) / TICK_MS)
+
+ExportOptions = namedtuple(
+    "ExportOptions", ["output", "raw", "size", "frames_per_tick", "first"]
+)
+
+
+class ReplayClock:
+    """Stands in for pygame.time.get_ticks while a replay is simulated.
+
+    Power-up and AI respawn timers read pygame's clock, but an export runs
+    at its own pace. Installed in the export processes only, it returns the
+    time each tick had when it was recorded.
+    """
+
+    def __init__(self):
+        self.now = 0
+
+    def get_ticks(self):
+        return self.now
+
+    def install(self):
+        pygame.time.get_ticks = self.get_ticks
+
+
+class NullHistory:
+    """Replaces ScoreHistory so a replayed death is not recorded again."""
+
+    def record_run(self, *args, **kwargs):
+        pass
+
+    def close(self):
+        pass
+
+
+def open_replay(path):
+    pygame.init()
+    clock = ReplayClock()
+    clock.install()
+    subscribe_effects()
+    game = Game(history=NullHistory())
+    game.wait_until_ready()
+    return game, read_replay(path), clock
+
+
+def restore(game, replay, clock, state, tick):
+    # state was saved right before tick ran; load_state also rebuilds the
+    # floor from the seed in the state, so every process draws the same one
+    clock.now = replay.times[tick]
+    load_state(game, state)
+    particles.clear()
+
+
+def play_tick(game, replay, clock, tick):
+    clock.now = replay.times[tick]
+    key, spawn_powerup = tick_input(replay, tick)
+    # Particles then look the same whichever chunk simulates the tick
+    particles.rng.seed(tick)
+    if spawn_powerup:
+        game.spawn_random_powerup()
+    game.input_queue.clear()
+    if key is not None:
+        game.input_queue.handle_key(key)
+    game.update()
+    game.publish_state(tick + 1)
+
+
+def plan_chunks(path, first, last, count):
+    """Simulates the replay once and saves the state each chunk starts from.
+
+    Returns (start tick, state, first tick, last tick) per chunk; the
+    workers then only simulate their own range.
+    """
+    game, replay, clock = open_replay(path)
+    bounds = [first + (last - first) * i // count for i in range(count + 1)]
+    chunks = []
+    restore(game, replay, clock, replay.start, 0)
+    tick = 0
+    for chunk_first, chunk_last in zip(bounds, bounds[1:]):
+        if chunk_first == chunk_last:
+            continue
+        start = max(0, chunk_first - WARMUP_TICKS)
+        while tick < start:
+            play_tick(game, replay, clock, tick)
+            tick += 1
+        clock.now = replay.times[tick]
+        chunks.append((start, save_state(game, include_rng=True), chunk_first, chunk_last))
+    game.history.close()
+    return chunks
+
+
+_worker = None
+
+
+def start_worker(path):
+    global _worker
+    _worker = open_replay(path)
+
+
+def render_chunk(chunk, options):
+    game, replay, clock = _worker
+    start, state, first, last = chunk
+    restore(game, replay, clock, state, start)
+    frame_ms = TICK_MS / options.frames_per_tick
+    stream = open(options.output, "r+b") if options.raw else None
+    try:
+        for tick in range(start, last):
+            play_tick(game, replay, clock, tick)
+            for i in range(options.frames_per_tick):
+                particles.update(frame_ms)
+                if tick < first:
+                    continue
+                game.draw_frame()
+                frame = game.screen
+                if frame.get_size() != options.size:
+                    frame = pygame.transform.smoothscale(frame, options.size)
+                number = (tick - options.first) * options.frames_per_tick + i
+                if stream:
+                    data = pygame.image.tobytes(frame, "RGB")
+                    stream.seek(number * len(data))
+                    stream.write(data)
+                else:
+                    pygame.image.save(frame, os.path.join(options.output, f"frame_{number:06d}.png"))
+    finally:
+        if stream:
+            stream.close()
+    return (last - first) * options.frames_per_tick
+
+
+def export(path, output, first=0, last=None, jobs=None, raw=False, scale=1.0, frames_per_tick=1):
+    """Renders ticks first..last of a replay with a pool of processes.
+
+    Writes numbered PNGs into the output directory, or with raw=True one
+    stream of RGB frames into the output file, each frame at its own offset
+    so chunks can finish in any order. Returns the number of frames.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    ticks = len(read_replay(path).inputs)
+    last = ticks if last is None else min(last, ticks)
+    if not 0 <= first < last:
+        raise ValueError(f"Nothing to render between ticks {first} and {last}")
+    size = (round(SCREEN_WIDTH * scale), round(SCREEN_HEIGHT * scale))
+    frames = (last - first) * frames_per_tick
+    if raw:
+        with open(output, "wb") as f:
+            f.truncate(frames * size[0] * size[1] * 3)
+    else:
+        os.makedirs(output, exist_ok=True)
+
+    # A few chunks per process keep them all busy until the end
+    chunks = plan_chunks(path, first, last, min(last - first, jobs * 4))
+    options = ExportOptions(output, raw, size, frames_per_tick, first)
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=start_worker,
+        initargs=(path,),
+    ) as pool:
+        done = sum(pool.map(render_chunk, chunks, [options] * len(chunks)))
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a recorded run to image files.")
+    parser.add_argument("replay", nargs="?", default=REPLAY_FILE)
+    parser.add_argument("output", nargs="?", default="frames")
+    parser.add_argument("--first", type=int, default=0, help="first tick to render")
+    parser.add_argument("--last", type=int, default=None, help="tick to stop before")
+    parser.add_argument("--jobs", type=int, default=None, help="processes, default one per core")
+    parser.add_argument("--raw", action="store_true", help="write one RGB24 stream instead of PNGs")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--frames-per-tick", type=int, default=1)
+    args = parser.parse_args()
+
+    jobs = args.jobs or os.cpu_count() or 1
+    start = time.perf_counter()
+    frames = export(
+        args.replay,
+        args.output,
+        args.first,
+        args.last,
+        jobs,
+        args.raw,
+        args.scale,
+        args.frames_per_tick,
+    )
+    elapsed = time.perf_counter() - start
+    print(f"{frames} frames in {elapsed:.1f} s, {frames / elapsed:.1f} frames/s on {jobs} processes")
+    if args.raw:
+        width, height = round(SCREEN_WIDTH * args.scale), round(SCREEN_HEIGHT * args.scale)
+        fps = 1000 * args.frames_per_tick / TICK_MS
+        print(
+            f"ffmpeg -f rawvideo -pix_fmt rgb24 -s {width}x{height} -r {fps:g} -i {args.output} clip.mp4"
+        )
+
+
+if __name__ == "__main__":
+    main()
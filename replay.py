@@ -0,0 +1,99 @@
+import struct
+from array import array
+from collections import namedtuple
+import pygame
+from controls import KEY_DIRECTIONS
+from savestate import save_state
+
+MAGIC = b"PKMR"
+VERSION = 1
+REPLAY_FILE = "last_run.replay"
+
+HEADER = struct.Struct("<4sBII")  # magic, version, ticks, start state size
+
+# One input byte per tick: the low bits are the applied direction as an
+# index into DIRECTION_KEYS plus one (0 for none), POWERUP marks a power-up
+# spawned since the previous tick
+DIRECTION_KEYS = list(KEY_DIRECTIONS)
+DIRECTIONS = list(KEY_DIRECTIONS.values())
+DIRECTION_MASK = 7
+POWERUP = 8
+
+Replay = namedtuple("Replay", ["start", "times", "inputs"])
+
+
+class Recorder:
+    """Records a run so it can be simulated again tick for tick.
+
+    The first recorded tick saves the whole game state, random module
+    included, so the seed and everything set up before the run are covered.
+    After that every tick adds the pygame time it ran at and its input, which
+    keeps power-up and respawn timers exact. About five bytes per tick.
+    """
+
+    def __init__(self):
+        self.start = None
+        self.times = array("I")
+        self.inputs = array("B")
+        self.pending = 0
+
+    def spawn_powerup(self):
+        # A spawn before the first tick is already part of the start state
+        if self.start is not None:
+            self.pending |= POWERUP
+
+    def tick(self, game, direction):
+        # Called before the tick changes anything
+        if self.start is None:
+            self.start = save_state(game, include_rng=True)
+        code = 0 if direction is None else DIRECTIONS.index(direction) + 1
+        self.times.append(pygame.time.get_ticks())
+        self.inputs.append(code | self.pending)
+        self.pending = 0
+
+    def to_bytes(self):
+        if self.start is None:
+            return None
+        return b"".join(
+            [
+                HEADER.pack(MAGIC, VERSION, len(self.inputs), len(self.start)),
+                self.start,
+                self.times.tobytes(),
+                self.inputs.tobytes(),
+            ]
+        )
+
+    def save(self, path=REPLAY_FILE):
+        data = self.to_bytes()
+        if data is None:
+            return False
+        with open(path, "wb") as f:
+            f.write(data)
+        return True
+
+
+def load_replay(data):
+    magic, version, ticks, start_size = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a Perkmandlc replay")
+    if version != VERSION:
+        raise ValueError(f"Unsupported replay version {version}")
+    offset = HEADER.size
+    start = bytes(data[offset : offset + start_size])
+    offset += start_size
+    times = array("I", data[offset : offset + 4 * ticks])
+    offset += 4 * ticks
+    inputs = array("B", data[offset : offset + ticks])
+    return Replay(start, times, inputs)
+
+
+def read_replay(path=REPLAY_FILE):
+    with open(path, "rb") as f:
+        return load_replay(f.read())
+
+
+def tick_input(replay, tick):
+    """Returns (key, spawn_powerup) for a tick; key is None without a turn."""
+    code = replay.inputs[tick]
+    direction = code & DIRECTION_MASK
+    return (DIRECTION_KEYS[direction - 1] if direction else None), bool(code & POWERUP)
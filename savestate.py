@@ -0,0 +1,352 @@
+import random
+import struct
+from array import array
+from collections import namedtuple
+import pygame
+from pygame.math import Vector2
+from assets import get_image
+from entities.powerup_entity import POWERUP_IMAGES, PowerUpEntity, PowerUpType
+from powerups.speed_boost import SpeedBoost
+from powerups.torch import TorchPowerUp
+
+QUICKSAVE_FILE = "quicksave.bin"
+
+MAGIC = b"PKMS"
+VERSION = 3
+# Version 1 may set bit 16 (see below); versions 1 and 2 have no floor seed
+OLD_VERSIONS = (1, 2)
+
+# Header flags; bit 16 is reserved, version 1 used it for a tutorial flag
+MULTIPLAYER = 1
+HAS_AI = 2
+AI_ALIVE = 4
+TUTORIAL = 8
+HAS_RNG = 32
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+POWERUP_TYPES = [PowerUpType.SPEED_BOOST, PowerUpType.TORCH]
+POWERUP_CLASSES = [SpeedBoost, TorchPowerUp]
+
+HEADER = struct.Struct("<4sBB")
+# difficulty, tutorial step, seed (-1 for none), ms since run start,
+# event timer, event cooldown
+GAME = struct.Struct("<BBiIiI")
+FLOOR = struct.Struct("<I")  # seed of the floor tiles, since version 3
+# direction x/y, grow flag, speed, fog disabled, body length, powerup count
+TRAIN = struct.Struct("<bbBBBHB")
+ACTIVE_POWERUP = struct.Struct("<BI")  # type, ms left
+RESPAWN = struct.Struct("<I")  # ms until the AI respawns, 0 while alive
+COUNT = struct.Struct("<H")
+WORLD_POWERUP = struct.Struct("<Bbb")
+RNG_TAIL = struct.Struct("<Bd")  # has gauss_next, gauss_next
+RNG_WORDS = 625
+
+# World states: trains and coal only, as plain cells, for code without a Game
+WORLD_MAGIC = b"PKMW"
+WORLD_VERSION = 1
+WORLD_HEADER = struct.Struct("<4sBIB")  # magic, version, tick, train count
+# id, direction x/y, grow flag, alive, body length, timer
+WORLD_TRAIN = struct.Struct("<HbbBBHI")
+
+# A train read from a save state, before it is applied to the game
+SavedTrain = namedtuple(
+    "SavedTrain", ["direction", "grow", "speed", "fog_disabled", "body", "powerups"]
+)
+
+# timer is whatever tick the owner counts towards, e.g. a respawn tick
+WorldTrain = namedtuple("WorldTrain", ["id", "cells", "direction", "grow", "alive", "timer"])
+
+
+def _pack_cells(positions):
+    # Signed bytes so cells just off the grid (a crashed head) survive too
+    cells = array("b")
+    for pos in positions:
+        cells.append(int(pos[0]))
+        cells.append(int(pos[1]))
+    return cells.tobytes()
+
+
+def _check_size(data, offset, size):
+    # array() and slices quietly come up short where struct would raise
+    if offset + size > len(data):
+        raise ValueError("Truncated save state")
+
+
+def _check_code(code, items, what):
+    if code >= len(items):
+        raise ValueError(f"Unknown {what} {code} in save state")
+    return items[code]
+
+
+def _unpack_pairs(data, offset, count):
+    _check_size(data, offset, 2 * count)
+    cells = array("b", data[offset : offset + 2 * count])
+    return [(cells[i], cells[i + 1]) for i in range(0, 2 * count, 2)], offset + 2 * count
+
+
+def _unpack_cells(data, offset, count):
+    pairs, offset = _unpack_pairs(data, offset, count)
+    return [Vector2(x, y) for x, y in pairs], offset
+
+
+def pack_world(tick, trains, coal):
+    """Packs WorldTrain tuples and coal cells, no Game or pygame needed.
+
+    Cells are (x, y) pairs, bodies head first. Used by the multiplayer
+    server to keep rollback states and by the bitboard simulation, so a
+    search can start from a stored position.
+    """
+    parts = [WORLD_HEADER.pack(WORLD_MAGIC, WORLD_VERSION, tick, len(trains))]
+    for train in trains:
+        dx, dy = train.direction
+        parts.append(
+            WORLD_TRAIN.pack(
+                train.id, int(dx), int(dy), train.grow, train.alive, len(train.cells), train.timer
+            )
+        )
+        parts.append(_pack_cells(train.cells))
+    parts.append(COUNT.pack(len(coal)))
+    parts.append(_pack_cells(coal))
+    return b"".join(parts)
+
+
+def unpack_world(data):
+    """Returns (tick, trains, coal) from pack_world, with cells as tuples."""
+    magic, version, tick, count = WORLD_HEADER.unpack_from(data, 0)
+    if magic != WORLD_MAGIC:
+        raise ValueError("Not a Perkmandlc world state")
+    if version != WORLD_VERSION:
+        raise ValueError(f"Unsupported world state version {version}")
+    offset = WORLD_HEADER.size
+    trains = []
+    for _ in range(count):
+        tid, dx, dy, grow, alive, length, timer = WORLD_TRAIN.unpack_from(data, offset)
+        cells, offset = _unpack_pairs(data, offset + WORLD_TRAIN.size, length)
+        trains.append(WorldTrain(tid, cells, (dx, dy), bool(grow), bool(alive), timer))
+    (count,) = COUNT.unpack_from(data, offset)
+    coal, offset = _unpack_pairs(data, offset + COUNT.size, count)
+    return tick, trains, coal
+
+
+def _pack_train(train, now):
+    powerups = [p for p in train.active_powerups if p.active]
+    parts = [
+        TRAIN.pack(
+            int(train.direction.x),
+            int(train.direction.y),
+            train.add_block_flag,
+            train.speed,
+            train.fog_disabled,
+            len(train.body),
+            len(powerups),
+        ),
+        _pack_cells(train.body),
+    ]
+    for powerup in powerups:
+        left = max(0, powerup.duration - (now - powerup.start_time))
+        parts.append(ACTIVE_POWERUP.pack(POWERUP_CLASSES.index(type(powerup)), left))
+    return parts
+
+
+def _unpack_train(data, offset):
+    dx, dy, grow, speed, fog_disabled, length, num_powerups = TRAIN.unpack_from(data, offset)
+    offset += TRAIN.size
+    body, offset = _unpack_cells(data, offset, length)
+    powerups = []
+    for _ in range(num_powerups):
+        code, left = ACTIVE_POWERUP.unpack_from(data, offset)
+        offset += ACTIVE_POWERUP.size
+        powerups.append((_check_code(code, POWERUP_TYPES, "power-up"), left))
+    return SavedTrain(Vector2(dx, dy), bool(grow), speed, bool(fog_disabled), body, powerups), offset
+
+
+def _restore_train(train, saved, now):
+    train.reset()
+    train.body = saved.body
+    train.direction = saved.direction
+    train.add_block_flag = saved.grow
+    for ptype, left in saved.powerups:
+        train.collect_powerup(ptype)
+        powerup = train.active_powerups[-1]
+        powerup.start_time = now - (powerup.duration - left)
+    # The saved values win over whatever the powerups applied
+    if saved.speed > 1:
+        train.increaseSpeed()
+    else:
+        train.resetSpeed()
+    train.fog_disabled = saved.fog_disabled
+
+
+def save_state(game, include_rng=False):
+    """Packs the whole simulation state of game into a few hundred bytes.
+
+    Cells are stored as pairs of signed bytes and timers relative to now, so
+    a state can be restored later or in another process. include_rng adds
+    the 2.5 KB state of the random module, which makes a resumed run play
+    out exactly like the original.
+    """
+    now = pygame.time.get_ticks()
+    ai = game.ai_train
+    flags = 0
+    if game.is_multiplayer:
+        flags |= MULTIPLAYER
+    if ai is not None:
+        flags |= HAS_AI
+        if ai.alive:
+            flags |= AI_ALIVE
+    if game.tutorial_mode:
+        flags |= TUTORIAL
+    if include_rng:
+        flags |= HAS_RNG
+
+    scheduler = game.event_scheduler
+    parts = [
+        HEADER.pack(MAGIC, VERSION, flags),
+        GAME.pack(
+            DIFFICULTIES.index(game.difficulty),
+            game.tutorial_step,
+            -1 if game.seed is None else game.seed,
+            max(0, now - game.run_started),
+            scheduler.timer,
+            scheduler.event_cooldown,
+        ),
+        FLOOR.pack(game.floor_seed),
+    ]
+    parts += _pack_train(game.train, now)
+    if ai is not None:
+        parts += _pack_train(ai, now)
+        parts.append(RESPAWN.pack(max(0, ai.respawn_timer - now) if not ai.alive else 0))
+
+    parts.append(COUNT.pack(len(game.coal.positions)))
+    parts.append(_pack_cells(game.coal.positions))
+
+    parts.append(COUNT.pack(len(game.world_powerups)))
+    for pu in game.world_powerups:
+        parts.append(WORLD_POWERUP.pack(POWERUP_TYPES.index(pu.type), int(pu.pos.x), int(pu.pos.y)))
+
+    events = scheduler.current_events
+    parts.append(COUNT.pack(len(events)))
+    parts.append(bytes(scheduler.possible_events.index(event) for event in events))
+
+    if include_rng:
+        _, words, gauss_next = random.getstate()
+        parts.append(array("I", words).tobytes())
+        parts.append(RNG_TAIL.pack(gauss_next is not None, gauss_next or 0.0))
+    return b"".join(parts)
+
+
+def load_state(game, data):
+    """Restores a state made by save_state into game, replacing the current run.
+
+    The whole state is read and checked first, so a truncated or unknown
+    state raises ValueError or struct.error and leaves game untouched.
+    """
+    magic, version, flags = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a Perkmandlc save state")
+    if version != VERSION and version not in OLD_VERSIONS:
+        raise ValueError(f"Unsupported save state version {version}")
+    offset = HEADER.size
+
+    difficulty, tutorial_step, seed, elapsed, timer, cooldown = GAME.unpack_from(data, offset)
+    offset += GAME.size
+    difficulty = _check_code(difficulty, DIFFICULTIES, "difficulty")
+    floor_seed = None
+    if version >= 3:
+        (floor_seed,) = FLOOR.unpack_from(data, offset)
+        offset += FLOOR.size
+
+    player, offset = _unpack_train(data, offset)
+    ai = None
+    if flags & HAS_AI:
+        ai, offset = _unpack_train(data, offset)
+        (respawn_in,) = RESPAWN.unpack_from(data, offset)
+        offset += RESPAWN.size
+
+    (count,) = COUNT.unpack_from(data, offset)
+    coal, offset = _unpack_cells(data, offset + COUNT.size, count)
+
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    world_powerups = []
+    for _ in range(count):
+        code, x, y = WORLD_POWERUP.unpack_from(data, offset)
+        offset += WORLD_POWERUP.size
+        world_powerups.append((_check_code(code, POWERUP_TYPES, "power-up"), Vector2(x, y)))
+
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    _check_size(data, offset, count)
+    scheduler = game.event_scheduler
+    events = [_check_code(i, scheduler.possible_events, "event") for i in data[offset : offset + count]]
+    offset += count
+
+    rng_state = None
+    if flags & HAS_RNG:
+        _check_size(data, offset, 4 * RNG_WORDS)
+        words = array("I", data[offset : offset + 4 * RNG_WORDS])
+        offset += 4 * RNG_WORDS
+        has_gauss, gauss_next = RNG_TAIL.unpack_from(data, offset)
+        rng_state = (3, tuple(words), gauss_next if has_gauss else None)
+
+    # Everything was read, from here on only game is changed
+    now = pygame.time.get_ticks()
+    if floor_seed is not None:
+        game.rebuild_floor(floor_seed)
+    game.difficulty = difficulty
+    game.seed = None if seed < 0 else seed
+    game.run_started = now - elapsed
+    game.is_multiplayer = bool(flags & MULTIPLAYER)
+    game.tutorial_mode = bool(flags & TUTORIAL)
+    game.tutorial_step = min(tutorial_step, len(game.tutorial_steps) - 1)
+
+    _restore_train(game.train, player, now)
+    game.show_score(len(game.train.body) - 3)
+
+    if ai is not None:
+        if game.ai_train is None:
+            game.ai_train = game.make_ai_train(None)
+        _restore_train(game.ai_train, ai, now)
+        game.ai_train.alive = bool(flags & AI_ALIVE)
+        game.ai_train.respawn_timer = 0 if game.ai_train.alive else now + respawn_in
+    else:
+        game.ai_train = None
+
+    game.coal.positions = coal
+    game.world_powerups = [
+        PowerUpEntity(ptype, pos, get_image(POWERUP_IMAGES[ptype])) for ptype, pos in world_powerups
+    ]
+
+    scheduler.timer = timer
+    scheduler.event_cooldown = cooldown
+    scheduler.current_events = events
+
+    if rng_state is not None:
+        random.setstate(rng_state)
+
+    game.input_queue.clear()
+    game.in_main_menu = False
+    game.paused = False
+    game.pause_menu = None
+    game.options_menu = None
+    game.you_died_menu = None
+
+
+def quick_save(game, path=QUICKSAVE_FILE):
+    with open(path, "wb") as f:
+        f.write(save_state(game, include_rng=True))
+
+
+def quick_load(game, path=QUICKSAVE_FILE):
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        print("No quick save found.")
+        return False
+    try:
+        load_state(game, data)
+    except (ValueError, struct.error) as e:
+        print(f"Could not load the quick save {path}: {e}")
+        return False
+    return True
@@ -0,0 +1,97 @@
+import queue
+import sqlite3
+import threading
+import time
+
+HISTORY_FILE = "score_history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    difficulty TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    death_cause TEXT NOT NULL,
+    seed INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_difficulty ON runs (difficulty, score DESC);
+CREATE INDEX IF NOT EXISTS runs_by_mode ON runs (mode, score DESC);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC);
+"""
+
+INSERT = """
+INSERT INTO runs (score, duration_ms, difficulty, mode, death_cause, seed, created_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class ScoreHistory:
+    """Run history in SQLite with inserts batched on a writer thread.
+
+    record_run() only queues the row. The writer commits whatever has queued
+    up in one transaction, and leaderboard queries are cached until the next
+    commit.
+    """
+
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self.rows = queue.Queue()
+        self.version = 0
+        self.cache = {}
+        self.reader = None
+        with sqlite3.connect(self.path) as connection:
+            connection.executescript(SCHEMA)
+        self.writer = threading.Thread(target=self.__write_rows, name="score-history", daemon=True)
+        self.writer.start()
+
+    def record_run(self, score, duration_ms, difficulty, mode, death_cause, seed=None):
+        self.rows.put((score, duration_ms, difficulty, mode, death_cause, seed, time.time()))
+
+    def __write_rows(self):
+        connection = sqlite3.connect(self.path)
+        while True:
+            row = self.rows.get()
+            if row is None:
+                break
+            batch = [row]
+            while not self.rows.empty():
+                row = self.rows.get_nowait()
+                if row is None:
+                    break
+                batch.append(row)
+            with connection:
+                connection.executemany(INSERT, batch)
+            self.version += 1
+            if row is None:
+                break
+        connection.close()
+
+    def top(self, difficulty=None, mode=None, limit=10):
+        key = (difficulty, mode, limit)
+        cached = self.cache.get(key)
+        if cached and cached[0] == self.version:
+            return cached[1]
+        if self.reader is None:
+            self.reader = sqlite3.connect(self.path)
+        clauses, params = [], []
+        if difficulty:
+            clauses.append("difficulty = ?")
+            params.append(difficulty)
+        if mode:
+            clauses.append("mode = ?")
+            params.append(mode)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        version = self.version
+        rows = self.reader.execute(
+            f"SELECT score, duration_ms, difficulty, mode, death_cause FROM runs {where} "
+            "ORDER BY score DESC LIMIT ?",
+            params + [limit],
+        ).fetchall()
+        self.cache[key] = (version, rows)
+        return rows
+
+    def close(self):
+        self.rows.put(None)
+        self.writer.join()
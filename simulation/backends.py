@@ -0,0 +1,15 @@
+from simulation.bitboard import BitboardSimulation
+from simulation.list_sim import ListSimulation
+
+BACKENDS = {
+    ListSimulation.name: ListSimulation,
+    BitboardSimulation.name: BitboardSimulation,
+}
+
+
+def make_simulation(backend="bitboard", num_ai=1, seed=None):
+    try:
+        cls = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown simulation backend: {backend}") from None
+    return cls(num_ai=num_ai, seed=seed)
@@ -0,0 +1,128 @@
+import argparse
+import random
+import time
+from collections import deque
+from simulation.backends import BACKENDS, make_simulation
+from simulation.bitboard import FULL, bit, flood_fill
+from simulation.rules import MOVES, in_bounds
+
+OPPOSITE = {move: (-move[0], -move[1]) for move in MOVES}
+
+
+def random_policy(rng, current):
+    # Mostly keep going, sometimes turn, never reverse
+    if current in MOVES and rng.random() < 0.8:
+        return current
+    return rng.choice([m for m in MOVES if m != OPPOSITE.get(current)])
+
+
+def play(backend, seed, num_ai, max_ticks):
+    # Yields the simulation after every tick of a seeded random game
+    sim = make_simulation(backend, num_ai=num_ai, seed=seed)
+    rng = random.Random(seed)
+    player_dir = (0, 0)
+    ai_dirs = [(1, 0)] * num_ai
+    for _ in range(max_ticks):
+        if sim.done:
+            return
+        player_dir = random_policy(rng, player_dir)
+        ai_dirs = [random_policy(rng, d) for d in ai_dirs]
+        sim.step(player_dir, ai_dirs)
+        yield sim
+
+
+def verify(games, num_ai, max_ticks):
+    ticks = 0
+    for seed in range(games):
+        runs = zip(*(play(name, seed, num_ai, max_ticks) for name in BACKENDS))
+        for sims in runs:
+            ticks += 1
+            reference = sims[0]
+            for sim in sims[1:]:
+                same = (
+                    sim.done == reference.done
+                    and sim.score == reference.score
+                    and sim.coal_counts() == reference.coal_counts()
+                    and (sim.done or sim.player_cells() == reference.player_cells())
+                    and sim.ai_cells() == reference.ai_cells()
+                )
+                if not same:
+                    raise AssertionError(
+                        f"{sim.name} diverged from {reference.name} "
+                        f"in game {seed} at tick {reference.tick}"
+                    )
+    return ticks
+
+
+def time_backend(backend, games, num_ai, max_ticks):
+    steps = 0
+    copies = 0
+    step_time = 0
+    copy_time = 0
+    for seed in range(games):
+        start = time.perf_counter()
+        for sim in play(backend, seed, num_ai, max_ticks):
+            steps += 1
+        step_time += time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(100):
+            sim.copy()
+        copy_time += time.perf_counter() - start
+        copies += 100
+    return step_time / steps * 1e6, copy_time / copies * 1e6
+
+
+def list_reachable(sim):
+    # Breadth-first search over the list state, the baseline for flood_fill
+    blocked = set(sim.player_cells())
+    for cells in sim.ai_cells():
+        blocked.update(cells or ())
+    start = sim.player_cells()[0]
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in MOVES:
+            nxt = (x + dx, y + dy)
+            if in_bounds(*nxt) and nxt not in blocked and nxt not in seen:
+                seen.add(nxt)
+                queue.append(nxt)
+    return len(seen) - 1
+
+
+def time_reachable(repeats=200):
+    list_sim = make_simulation("list", num_ai=3, seed=1)
+    bit_sim = make_simulation("bitboard", num_ai=3, seed=1)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        list_area = list_reachable(list_sim)
+    list_time = (time.perf_counter() - start) / repeats
+    start = time.perf_counter()
+    for _ in range(repeats):
+        free = FULL & ~bit_sim.obstacles()
+        head = bit(bit_sim.player.head)
+        from_head = flood_fill(head, free | head)
+        bit_area = from_head.bit_count() - 1
+    bit_time = (time.perf_counter() - start) / repeats
+    assert list_area == bit_area
+    return list_time * 1e6, bit_time * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the simulation backends.")
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--ai", type=int, default=3)
+    parser.add_argument("--ticks", type=int, default=400)
+    args = parser.parse_args()
+
+    ticks = verify(args.games, args.ai, args.ticks)
+    print(f"verified {ticks} ticks over {args.games} games: backends match")
+    for name in BACKENDS:
+        step_us, copy_us = time_backend(name, args.games, args.ai, args.ticks)
+        print(f"{name:<10} step {step_us:7.1f} us   copy {copy_us:7.1f} us")
+    list_us, bit_us = time_reachable()
+    print(f"reachable area: list BFS {list_us:7.1f} us   bitboard flood fill {bit_us:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+from collections import Counter, deque
+from constants import CELL_COUNT
+from entities.coal import random_coal_cell
+from savestate import WorldTrain, pack_world, unpack_world
+from simulation.rules import (
+    PLAYER_START,
+    RESPAWN_TICKS,
+    STILL,
+    ai_start,
+    make_rng,
+    safe_ai_spawn,
+)
+
+# Cell c = y * CELL_COUNT + x is bit c of a Python int, so one int holds a
+# whole 50x50 layer and set operations are single big-int expressions.
+W = CELL_COUNT
+FULL = (1 << (W * W)) - 1
+FIRST_COL = sum(1 << (y * W) for y in range(W))
+LAST_COL = FIRST_COL << (W - 1)
+OFF_GRID = -1
+
+
+def cell(x, y):
+    return y * W + x if 0 <= x < W and 0 <= y < W else OFF_GRID
+
+
+def bit(c):
+    return 1 << c if c >= 0 else 0
+
+
+def shift(board, dx, dy):
+    if dx == 1:
+        board = (board & ~LAST_COL) << 1
+    elif dx == -1:
+        board = (board & ~FIRST_COL) >> 1
+    if dy == 1:
+        board = (board << W) & FULL
+    elif dy == -1:
+        board >>= W
+    return board
+
+
+def neighbours(board):
+    return (
+        ((board & ~LAST_COL) << 1)
+        | ((board & ~FIRST_COL) >> 1)
+        | ((board << W) & FULL)
+        | (board >> W)
+    )
+
+
+def flood_fill(start, free, max_rings=None):
+    # Every cell of `free` reachable from `start`, one shift per ring
+    reached = start & free
+    rings = 0
+    while max_rings is None or rings < max_rings:
+        grown = (reached | neighbours(reached)) & free
+        if grown == reached:
+            break
+        reached = grown
+        rings += 1
+    return reached
+
+
+def cells_of(board):
+    while board:
+        low = board & -board
+        yield low.bit_length() - 1
+        board ^= low
+
+
+class BitTrain:
+    """Train body as a cell deque for ordering plus a bitboard of body[1:]."""
+
+    __slots__ = ("cells", "tail_board", "direction", "grow_pending", "alive")
+
+    def __init__(self, positions, direction=STILL):
+        self.cells = deque(cell(x, y) for x, y in positions)
+        self.tail_board = 0
+        for c in list(self.cells)[1:]:
+            self.tail_board |= bit(c)
+        self.direction = direction
+        self.grow_pending = False
+        self.alive = True
+
+    def copy(self):
+        other = BitTrain.__new__(BitTrain)
+        other.cells = self.cells.copy()
+        other.tail_board = self.tail_board
+        other.direction = self.direction
+        other.grow_pending = self.grow_pending
+        other.alive = self.alive
+        return other
+
+    @property
+    def head(self):
+        return self.cells[0]
+
+    @property
+    def board(self):
+        return self.tail_board | bit(self.cells[0])
+
+    def move(self):
+        dx, dy = self.direction
+        if dx == 0 and dy == 0:
+            return
+        head = self.cells[0]
+        new_head = cell(head % W + dx, head // W + dy) if head >= 0 else OFF_GRID
+        self.tail_board |= bit(head)
+        self.cells.appendleft(new_head)
+        if self.grow_pending:
+            self.grow_pending = False
+        else:
+            self.tail_board &= ~bit(self.cells.pop())
+
+    def positions(self):
+        return [(c % W, c // W) for c in self.cells]
+
+
+class BitboardSimulation:
+    """Same rules and random draws as ListSimulation on bitboard layers."""
+
+    name = "bitboard"
+
+    def __init__(self, num_ai=1, seed=None):
+        self.num_ai = num_ai
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.rng = make_rng(seed)
+        self.tick = 0
+        self.done = False
+        self.player = BitTrain(PLAYER_START)
+        self.coal = 0
+        self.stacked = {}  # extra coal pieces sharing a cell
+        self.spawn_random_coal(3)
+        self.ais = []
+        self.respawn_ticks = []
+        for _ in range(self.num_ai):
+            self.ais.append(self.__spawn_ai())
+            self.respawn_ticks.append(0)
+
+    @classmethod
+    def from_positions(cls, player, player_direction, ais, ai_directions, coal, seed=None):
+        # Builds a state from live game objects, e.g. for AI search
+        sim = cls.__new__(cls)
+        sim.num_ai = len(ais)
+        sim.rng = make_rng(seed)
+        sim.tick = 0
+        sim.done = False
+        sim.player = BitTrain(player, player_direction)
+        sim.coal = 0
+        sim.stacked = {}
+        for x, y in coal:
+            sim.add_coal(cell(x, y))
+        sim.ais = [BitTrain(cells, d) for cells, d in zip(ais, ai_directions)]
+        sim.respawn_ticks = [0] * len(ais)
+        return sim
+
+    @classmethod
+    def from_world(cls, data, seed=None):
+        # Train 0 is the player, the rest are AI trains in order
+        tick, trains, coal = unpack_world(data)
+        player, *ais = trains
+        sim = cls.from_positions(
+            player.cells,
+            player.direction,
+            [ai.cells for ai in ais],
+            [ai.direction for ai in ais],
+            coal,
+            seed,
+        )
+        sim.tick = tick
+        sim.done = not player.alive
+        for train, state in zip([sim.player] + sim.ais, trains):
+            train.grow_pending = state.grow
+            train.alive = state.alive
+        sim.respawn_ticks = [ai.timer for ai in ais]
+        return sim
+
+    def to_world(self):
+        def cells(train):
+            return [(c % W, c // W) if c >= 0 else (-1, -1) for c in train.cells]
+
+        player = self.player
+        trains = [WorldTrain(0, cells(player), player.direction, player.grow_pending, player.alive, 0)]
+        for i, (ai, timer) in enumerate(zip(self.ais, self.respawn_ticks)):
+            trains.append(
+                WorldTrain(i + 1, cells(ai), ai.direction, ai.grow_pending, ai.alive, timer)
+            )
+        coal = [(c % W, c // W) for c in cells_of(self.coal)]
+        coal += [(c % W, c // W) for c, extra in self.stacked.items() for _ in range(extra)]
+        return pack_world(self.tick, trains, coal)
+
+    def copy(self):
+        other = BitboardSimulation.__new__(BitboardSimulation)
+        other.num_ai = self.num_ai
+        other.rng = self.rng.copy()
+        other.tick = self.tick
+        other.done = self.done
+        other.player = self.player.copy()
+        other.coal = self.coal
+        other.stacked = dict(self.stacked)
+        other.ais = [ai.copy() for ai in self.ais]
+        other.respawn_ticks = list(self.respawn_ticks)
+        return other
+
+    @property
+    def score(self):
+        return len(self.player.cells) - 3
+
+    # Coal layer
+
+    def add_coal(self, c):
+        if c < 0:
+            return
+        if self.coal >> c & 1:
+            self.stacked[c] = self.stacked.get(c, 0) + 1
+        else:
+            self.coal |= 1 << c
+
+    def remove_coal(self, c):
+        if c < 0 or not self.coal >> c & 1:
+            return False
+        if c in self.stacked:
+            self.stacked[c] -= 1
+            if not self.stacked[c]:
+                del self.stacked[c]
+        else:
+            self.coal &= ~(1 << c)
+        return True
+
+    def spawn_random_coal(self, count):
+        for _ in range(count):
+            x, y = random_coal_cell(self.rng)
+            self.add_coal(y * W + x)
+
+    # Trains
+
+    def __spawn_ai(self):
+        x, y = safe_ai_spawn(self.rng, self.player.positions())
+        return BitTrain(ai_start(x, y), (1, 0))
+
+    def __kill_ai(self, index, leave_coal):
+        ai = self.ais[index]
+        ai.alive = False
+        self.respawn_ticks[index] = self.tick + RESPAWN_TICKS
+        if leave_coal:
+            for c in ai.cells:
+                self.add_coal(c)
+
+    def obstacles(self, exclude=None):
+        # Every live body cell, optionally leaving one train out
+        board = 0
+        for train in [self.player] + self.ais:
+            if train.alive and train is not exclude:
+                board |= train.board
+        return board
+
+    def step(self, direction, ai_directions=None):
+        if self.done:
+            return
+        self.tick += 1
+        player = self.player
+        player.direction = tuple(direction)
+        player.move()
+
+        # Game.check_collision
+        if self.remove_coal(player.head):
+            player.grow_pending = True
+            self.spawn_random_coal(2)
+        for ai in self.ais:
+            if ai.alive and self.remove_coal(ai.head):
+                ai.grow_pending = True
+                self.spawn_random_coal(1)
+        if self.coal & player.tail_board:
+            # Respawned coal can land further down the body, so keep body order
+            for c in list(player.cells)[1:]:
+                if self.remove_coal(c):
+                    self.spawn_random_coal(1)
+        player_head = player.head
+        for i, ai in enumerate(self.ais):
+            if not ai.alive:
+                continue
+            if ai.head >= 0 and player.tail_board >> ai.head & 1:
+                self.__kill_ai(i, False)
+            elif player_head >= 0 and ai.tail_board >> player_head & 1:
+                self.done = True
+            elif ai.head == player_head:
+                self.done = True
+                self.__kill_ai(i, False)
+
+        # Game.check_fail
+        if player_head < 0:
+            self.done = True
+        elif player.direction != STILL and player.tail_board >> player_head & 1:
+            self.done = True
+
+        # AITrain.update_ai with the steering decided by the caller
+        for i, ai in enumerate(self.ais):
+            if not ai.alive:
+                if self.tick >= self.respawn_ticks[i]:
+                    self.ais[i] = self.__spawn_ai()
+                continue
+            if ai_directions is not None:
+                ai.direction = tuple(ai_directions[i])
+            ai.move()
+            head = ai.head
+            if head < 0 or (ai.tail_board | self.obstacles(ai)) >> head & 1:
+                self.__kill_ai(i, True)
+
+    # Read-only views shared with the list backend
+
+    def player_cells(self):
+        return self.player.positions()
+
+    def ai_cells(self):
+        return [ai.positions() if ai.alive else None for ai in self.ais]
+
+    def coal_counts(self):
+        counts = Counter()
+        for c in cells_of(self.coal):
+            counts[(c % W, c // W)] = 1 + self.stacked.get(c, 0)
+        return counts
+
+    def coal_count(self):
+        return self.coal.bit_count() + sum(self.stacked.values())
+
+    def free_cells(self, exclude=None):
+        return FULL & ~self.obstacles(exclude)
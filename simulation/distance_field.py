@@ -0,0 +1,171 @@
+from constants import CELL_COUNT
+
+UNREACHABLE = CELL_COUNT * CELL_COUNT  # longer than any path on the grid
+
+
+class DistanceField:
+    """Moves from every cell to the nearest coal, shared by all AI trains.
+
+    One multi-source BFS from the coal cells over the cells no train
+    occupies. update() compares the coal and the occupied cells with the
+    previous call and repairs the field only around what changed, which on
+    a normal tick is a train's new head and old tail plus the odd pickup.
+    Coal under a train does not count until the train has left it.
+
+    Repairs work in two passes. Cells that lost their source or got blocked
+    take down the cells whose every shortest path ran through them, visited
+    in order of their old distance. Those cells, and cells that were freed
+    or got coal, are then seeded from their neighbours and the field grows
+    back out of them in distance order.
+    """
+
+    def __init__(self, size=CELL_COUNT):
+        self.size = size
+        cells = size * size
+        self.dist = [UNREACHABLE] * cells
+        self.blocked = bytearray(cells)
+        self.sources = set()  # cells with coal, blocked or not
+        self.obstacles = set()
+        self.neighbors = []
+        for y in range(size):
+            for x in range(size):
+                self.neighbors.append(
+                    tuple(
+                        ny * size + nx
+                        for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y))
+                        if 0 <= nx < size and 0 <= ny < size
+                    )
+                )
+
+    def cells(self, positions):
+        size = self.size
+        found = set()
+        for pos in positions:
+            x, y = int(pos[0]), int(pos[1])
+            if 0 <= x < size and 0 <= y < size:
+                found.add(y * size + x)
+        return found
+
+    def distance(self, pos):
+        x, y = int(pos[0]), int(pos[1])
+        if 0 <= x < self.size and 0 <= y < self.size:
+            return self.dist[y * self.size + x]
+        return UNREACHABLE
+
+    def update(self, coal_positions, occupied):
+        """Brings the field up to date with coal positions and occupied cells."""
+        sources = self.cells(coal_positions)
+        obstacles = self.cells(occupied)
+        if sources == self.sources and obstacles == self.obstacles:
+            return
+
+        blocked = self.blocked
+        raised = []
+        lowered = []
+        for cell in obstacles - self.obstacles:
+            blocked[cell] = 1
+            raised.append(cell)
+        for cell in self.obstacles - obstacles:
+            blocked[cell] = 0
+            lowered.append(cell)
+        for cell in self.sources - sources:
+            if not blocked[cell]:
+                raised.append(cell)
+        for cell in sources - self.sources:
+            if not blocked[cell]:
+                lowered.append(cell)
+        self.sources = sources
+        self.obstacles = obstacles
+
+        lost = self.__invalidate(raised)
+        self.__propagate(self.__seed(lost.union(lowered)))
+
+    def rebuild(self, coal_positions, occupied):
+        # Full multi-source BFS from scratch, which update() has to match
+        self.sources = self.cells(coal_positions)
+        self.obstacles = self.cells(occupied)
+        self.blocked = bytearray(len(self.dist))
+        for cell in self.obstacles:
+            self.blocked[cell] = 1
+        self.dist = [UNREACHABLE] * len(self.dist)
+        self.__propagate(self.__seed(self.sources))
+
+    def __invalidate(self, raised):
+        dist = self.dist
+        neighbors = self.neighbors
+        lost = set(raised)
+        levels = {}
+        for cell in raised:
+            if dist[cell] < UNREACHABLE:
+                levels.setdefault(dist[cell], []).append(cell)
+        if not levels:
+            return lost
+        level = min(levels)
+        top = max(levels)
+        while level <= top:
+            found = []
+            for cell in levels.pop(level, ()):
+                for next_cell in neighbors[cell]:
+                    if dist[next_cell] != level + 1 or next_cell in lost:
+                        continue
+                    # Kept if another neighbour one step closer still stands
+                    if any(
+                        dist[other] == level and other not in lost
+                        for other in neighbors[next_cell]
+                    ):
+                        continue
+                    lost.add(next_cell)
+                    found.append(next_cell)
+            if found:
+                levels.setdefault(level + 1, []).extend(found)
+                top = max(top, level + 1)
+            level += 1
+        for cell in lost:
+            dist[cell] = UNREACHABLE
+        return lost
+
+    def __seed(self, cells):
+        dist = self.dist
+        blocked = self.blocked
+        neighbors = self.neighbors
+        sources = self.sources
+        seeds = []
+        for cell in cells:
+            if blocked[cell]:
+                dist[cell] = UNREACHABLE
+                continue
+            if cell in sources:
+                best = 0
+            else:
+                best = min([dist[other] for other in neighbors[cell]] + [UNREACHABLE - 1]) + 1
+            if best < UNREACHABLE:
+                dist[cell] = best
+                seeds.append(cell)
+        return seeds
+
+    def __propagate(self, seeds):
+        # BFS from seeds at different distances, one bucket per distance
+        dist = self.dist
+        blocked = self.blocked
+        neighbors = self.neighbors
+        levels = {}
+        for cell in seeds:
+            levels.setdefault(dist[cell], []).append(cell)
+        if not levels:
+            return
+        level = min(levels)
+        top = max(levels)
+        while level <= top:
+            reached = []
+            step = level + 1
+            for cell in levels.pop(level, ()):
+                if dist[cell] != level:
+                    continue
+                for next_cell in neighbors[cell]:
+                    if dist[next_cell] > step and not blocked[next_cell]:
+                        dist[next_cell] = step
+                        reached.append(next_cell)
+            if reached:
+                levels.setdefault(step, []).extend(reached)
+                top = max(top, step)
+            level += 1
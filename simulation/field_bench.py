@@ -0,0 +1,92 @@
+import argparse
+import random
+import time
+from pygame.math import Vector2
+from constants import CELL_COUNT
+from entities.ai_train import AITrain
+from entities.coal import Coal
+from simulation.distance_field import DistanceField
+from simulation.rules import PLAYER_START
+
+# greedy: the straight line target AITrain picks without a field
+# own field: every AI runs a full BFS from the coal for itself each tick
+# shared field: one DistanceField updated once per tick and read by all
+MODES = ["greedy", "own field", "shared field"]
+
+
+def random_spawn(rng):
+    return Vector2(rng.randint(5, CELL_COUNT - 6), rng.randint(5, CELL_COUNT - 6))
+
+
+def run(mode, num_ai, ticks, seed, check=False):
+    """Steps num_ai AI trains around a resting player for ticks ticks.
+
+    Returns the AI time per tick in ms, the coal collected and the deaths.
+    Only steering and moving are timed; pickups and respawns are not.
+    """
+    rng = random.Random(seed)
+    random.seed(seed)  # AITrain breaks ties with the random module
+    player = [Vector2(cell) for cell in PLAYER_START]
+    coal = Coal()
+    coal.spawn_random(3 + num_ai, rng)
+    trains = [AITrain(position=random_spawn(rng)) for _ in range(num_ai)]
+    shared = DistanceField()
+    own = DistanceField()
+    reference = DistanceField()
+    elapsed = 0.0
+    collected = 0
+    deaths = 0
+    for _ in range(ticks):
+        start = time.perf_counter()
+        occupied = player + [block for ai in trains if ai.alive for block in ai.body]
+        if mode == "shared field":
+            shared.update(coal.positions, occupied)
+            if check:
+                reference.rebuild(coal.positions, occupied)
+                assert reference.dist == shared.dist, "incremental field differs from a rebuild"
+        for ai in trains:
+            if not ai.alive:
+                continue
+            avoid = player + [block for other in trains if other is not ai and other.alive for block in other.body]
+            field = None
+            if mode == "own field":
+                own.rebuild(coal.positions, avoid + ai.body)
+                field = own
+            elif mode == "shared field":
+                field = shared
+            ai.update_ai(coal.positions, avoid, coal, field)
+        elapsed += time.perf_counter() - start
+
+        for ai in trains:
+            if not ai.alive:
+                deaths += 1
+                ai.reset(position=random_spawn(rng))
+            elif coal.check_pickup(ai.body[0]):
+                collected += 1
+                ai.grow()
+                coal.spawn_random(1, rng)
+    return elapsed / ticks * 1000, collected, deaths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time AI steering with and without a shared distance field.")
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--ai", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--check", action="store_true", help="compare the field with a rebuild every tick")
+    args = parser.parse_args()
+
+    if args.check:
+        for num_ai in args.ai:
+            run("shared field", num_ai, args.ticks, seed=num_ai, check=True)
+        print("shared field matches a full rebuild on every tick")
+
+    # A dead train leaves its body as coal, so deaths also feed the others
+    print("AI trains  mode           ms/tick   coal  deaths")
+    for num_ai in args.ai:
+        for mode in MODES:
+            ms, collected, deaths = run(mode, num_ai, args.ticks, seed=num_ai)
+            print(f"{num_ai:9}  {mode:<12} {ms:8.2f} {collected:6} {deaths:7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+from collections import Counter
+from pygame.math import Vector2
+from entities.ai_train import AITrain
+from entities.coal import Coal
+from entities.train import Train
+from simulation.rules import (
+    RESPAWN_TICKS,
+    in_bounds,
+    make_rng,
+    safe_ai_spawn,
+)
+
+
+class ListSimulation:
+    """Headless copy of Game.update built on the regular Train, AITrain and Coal.
+
+    AI directions are passed in by the caller instead of coming from
+    AITrain.update_ai, and no sounds are played. Trains that die leave coal
+    only on cells inside the grid.
+    """
+
+    name = "list"
+
+    def __init__(self, num_ai=1, seed=None):
+        self.num_ai = num_ai
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.rng = make_rng(seed)
+        self.tick = 0
+        self.done = False
+        self.player = Train()
+        self.coal = Coal()
+        self.coal.spawn_random(3, self.rng)
+        self.ais = []
+        self.respawn_ticks = []
+        for _ in range(self.num_ai):
+            ai = AITrain()
+            self.__respawn(ai)
+            self.ais.append(ai)
+            self.respawn_ticks.append(0)
+
+    def copy(self):
+        other = ListSimulation.__new__(ListSimulation)
+        other.num_ai = self.num_ai
+        other.rng = self.rng.copy()
+        other.tick = self.tick
+        other.done = self.done
+        other.player = self.__copy_train(self.player, Train)
+        other.coal = Coal()
+        other.coal.positions = [Vector2(pos) for pos in self.coal.positions]
+        other.ais = [self.__copy_train(ai, AITrain) for ai in self.ais]
+        other.respawn_ticks = list(self.respawn_ticks)
+        return other
+
+    @staticmethod
+    def __copy_train(train, cls):
+        copy = cls.__new__(cls)
+        copy.__dict__.update(train.__dict__)
+        copy.body = [Vector2(block) for block in train.body]
+        copy.direction = Vector2(train.direction)
+        copy.active_powerups = []
+        return copy
+
+    @property
+    def score(self):
+        return len(self.player.body) - 3
+
+    def __respawn(self, ai):
+        cells = [(int(b.x), int(b.y)) for b in self.player.body]
+        x, y = safe_ai_spawn(self.rng, cells)
+        ai.reset(Vector2(x, y))
+
+    def __pickup(self, head):
+        if head in self.coal.positions:
+            self.coal.positions.remove(head)
+            return True
+        return False
+
+    def __kill_ai(self, index, leave_coal):
+        ai = self.ais[index]
+        ai.alive = False
+        self.respawn_ticks[index] = self.tick + RESPAWN_TICKS
+        if leave_coal:
+            self.coal.spawn_at([b for b in ai.body if in_bounds(b.x, b.y)])
+
+    def step(self, direction, ai_directions=None):
+        if self.done:
+            return
+        self.tick += 1
+        player = self.player
+        player.direction = Vector2(direction)
+        player.update()
+
+        # Game.check_collision
+        if self.__pickup(player.body[0]):
+            player.grow()
+            self.coal.spawn_random(2, self.rng)
+        for ai in self.ais:
+            if ai.alive and self.__pickup(ai.body[0]):
+                ai.grow()
+                self.coal.spawn_random(1, self.rng)
+        for block in player.body[1:]:
+            if block in self.coal.positions:
+                self.coal.positions.remove(block)
+                self.coal.spawn_random(1, self.rng)
+        for i, ai in enumerate(self.ais):
+            if not ai.alive:
+                continue
+            if ai.body[0] in player.body[1:]:
+                self.__kill_ai(i, False)
+            elif player.body[0] in ai.body[1:]:
+                self.done = True
+            elif ai.body[0] == player.body[0]:
+                self.done = True
+                self.__kill_ai(i, False)
+
+        # Game.check_fail
+        head = player.body[0]
+        if not in_bounds(head.x, head.y):
+            self.done = True
+        if head in player.body[1:] and player.direction != Vector2(0, 0):
+            self.done = True
+
+        # AITrain.update_ai with the steering decided by the caller
+        for i, ai in enumerate(self.ais):
+            if not ai.alive:
+                if self.tick >= self.respawn_ticks[i]:
+                    self.__respawn(ai)
+                continue
+            if ai_directions is not None:
+                ai.direction = Vector2(ai_directions[i])
+            ai.update()
+            ai_head = ai.body[0]
+            avoid = list(player.body)
+            for other in self.ais:
+                if other is not ai and other.alive:
+                    avoid.extend(other.body)
+            if not in_bounds(ai_head.x, ai_head.y):
+                self.__kill_ai(i, True)
+            elif ai_head in ai.body[1:] or ai_head in avoid:
+                self.__kill_ai(i, True)
+
+    # Read-only views shared with the bitboard backend
+
+    def player_cells(self):
+        return [(int(b.x), int(b.y)) for b in self.player.body]
+
+    def ai_cells(self):
+        return [
+            [(int(b.x), int(b.y)) for b in ai.body] if ai.alive else None
+            for ai in self.ais
+        ]
+
+    def coal_counts(self):
+        return Counter((int(p.x), int(p.y)) for p in self.coal.positions)
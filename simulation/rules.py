@@ -0,0 +1,67 @@
+import random
+from constants import CELL_COUNT
+
+# Shared by both simulation backends so they draw the same random numbers
+RESPAWN_TICKS = 33  # roughly the 5 seconds AITrain waits at 150 ms per tick
+PLAYER_START = [(5, 10), (4, 10), (3, 10)]
+AI_SAFE_MARGIN = 8
+
+STILL = (0, 0)
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+MOVES = (UP, DOWN, LEFT, RIGHT)
+
+
+def in_bounds(x, y):
+    return 0 <= x < CELL_COUNT and 0 <= y < CELL_COUNT
+
+
+def safe_ai_spawn(rng, player_cells):
+    # Same search as Game.get_safe_ai_spawn
+    margin = AI_SAFE_MARGIN
+    for _ in range(20):
+        x = rng.randint(margin + 2, CELL_COUNT - margin - 1)
+        y = rng.randint(margin, CELL_COUNT - margin - 1)
+        if all((x - px) ** 2 + (y - py) ** 2 > margin**2 for px, py in player_cells):
+            return x, y
+    return CELL_COUNT - 5, CELL_COUNT - 5
+
+
+def ai_start(x, y):
+    return [(x, y), (x - 1, y), (x - 2, y)]
+
+
+class CopyableRandom:
+    """Seeded random source that copies without snapshotting every time.
+
+    The state tuple is captured lazily and shared between copies until one of
+    them draws again, so copying a simulation that did not spawn anything
+    since its last copy is free.
+    """
+
+    __slots__ = ("rng", "state")
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.state = None
+
+    def copy(self):
+        if self.state is None:
+            self.state = self.rng.getstate()
+        other = CopyableRandom.__new__(CopyableRandom)
+        other.rng = None
+        other.state = self.state
+        return other
+
+    def randint(self, a, b):
+        if self.rng is None:
+            self.rng = random.Random.__new__(random.Random)
+            self.rng.setstate(self.state)
+        self.state = None
+        return self.rng.randint(a, b)
+
+
+def make_rng(seed=None):
+    return CopyableRandom(seed)
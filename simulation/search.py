@@ -0,0 +1,122 @@
+import time
+from simulation.bitboard import FULL, W, bit, cells_of, flood_fill
+from simulation.rules import MOVES, STILL
+
+WIN = 100000
+LOSS = -100000
+AREA_RINGS = 8
+AREA_CAP = 40
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def legal_moves(direction):
+    # Reversing runs straight into the second cart, so it is never searched
+    reverse = (-direction[0], -direction[1])
+    moves = [move for move in MOVES if move != reverse]
+    if direction == STILL:
+        moves.append(STILL)
+    return moves
+
+
+def coal_distance(sim, head):
+    x, y = head % W, head // W
+    best = 2 * W
+    for c in cells_of(sim.coal):
+        best = min(best, abs(c % W - x) + abs(c // W - y))
+    return best
+
+
+def evaluate(sim, index):
+    ai = sim.ais[index]
+    head = ai.head
+    free = FULL & ~sim.obstacles()
+    area = flood_fill(bit(head), free | bit(head), AREA_RINGS).bit_count()
+    return len(ai.cells) * 20 + min(area, AREA_CAP) - coal_distance(sim, head)
+
+
+class MinimaxSearch:
+    """Depth-limited minimax over BitboardSimulation copies for one AI train.
+
+    The AI maximises and the player answers every AI move with its worst case
+    reply, with alpha-beta pruning. choose() deepens one ply at a time until
+    the time budget runs out and returns the move of the deepest finished pass.
+    """
+
+    def __init__(self, budget_ms=5, max_depth=8):
+        self.budget_ms = budget_ms
+        self.max_depth = max_depth
+        self.deadline = 0
+        self.nodes = 0
+        self.depth_reached = 0
+
+    def choose(self, sim, index=0):
+        self.deadline = time.perf_counter() + self.budget_ms / 1000
+        self.nodes = 0
+        self.depth_reached = 0
+        best_move = None
+        for depth in range(1, self.max_depth + 1):
+            try:
+                move, value = self.__root(sim, index, depth)
+            except SearchTimeout:
+                break
+            best_move = move
+            self.depth_reached = depth
+            if value >= WIN or value <= LOSS:
+                break  # outcome is forced either way
+        return best_move
+
+    def __ordered_ai_moves(self, sim, index):
+        ai = sim.ais[index]
+        head = ai.head
+        x, y = head % W, head // W
+        targets = [(c % W, c // W) for c in cells_of(sim.coal)]
+
+        def distance(move):
+            nx, ny = x + move[0], y + move[1]
+            return min((abs(tx - nx) + abs(ty - ny) for tx, ty in targets), default=0)
+
+        return sorted(legal_moves(ai.direction), key=distance)
+
+    def __child(self, sim, index, ai_move, player_move):
+        self.nodes += 1
+        if self.nodes & 31 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        child = sim.copy()
+        directions = [ai.direction for ai in sim.ais]
+        directions[index] = ai_move
+        child.step(player_move, directions)
+        return child
+
+    def __root(self, sim, index, depth):
+        best_move, best = None, float("-inf")
+        for ai_move in self.__ordered_ai_moves(sim, index):
+            value = self.__reply(sim, index, ai_move, depth, best, float("inf"))
+            if value > best:
+                best_move, best = ai_move, value
+        return best_move, best
+
+    def __reply(self, sim, index, ai_move, depth, alpha, beta):
+        worst = float("inf")
+        for player_move in legal_moves(sim.player.direction):
+            child = self.__child(sim, index, ai_move, player_move)
+            worst = min(worst, self.__value(child, index, depth - 1, alpha, min(beta, worst)))
+            if worst <= alpha:
+                break
+        return worst
+
+    def __value(self, sim, index, depth, alpha, beta):
+        if not sim.ais[index].alive:
+            return LOSS - depth  # dying later is better than dying now
+        if sim.done:
+            return WIN
+        if depth == 0:
+            return evaluate(sim, index)
+        best = float("-inf")
+        for ai_move in self.__ordered_ai_moves(sim, index):
+            best = max(best, self.__reply(sim, index, ai_move, depth, max(alpha, best), beta))
+            if best >= beta:
+                break
+        return best
@@ -0,0 +1,240 @@
+import numpy as np
+from constants import CELL_COUNT
+from simulation.rules import MOVES, PLAYER_START
+
+# Actions index into MOVES: up, down, left, right
+MOVE_X = np.array([dx for dx, _ in MOVES], dtype=np.int16)
+MOVE_Y = np.array([dy for _, dy in MOVES], dtype=np.int16)
+
+MAX_LENGTH = CELL_COUNT * CELL_COUNT + 1
+COAL_MARGIN = 3
+START_COAL = 3
+
+# Grid observation channels; coal holds counts, as pieces can share a cell
+BODY = 0
+HEAD = 1
+COAL = 2
+
+# Crop observation channels; the head is always the center cell
+CROP_BODY = 0
+CROP_COAL = 1
+CROP_WALL = 2
+
+
+class VectorEnv:
+    """Many independent single player boards stepped together with NumPy.
+
+    Follows Game.update for a player without an AI opponent: the chosen
+    direction goes through the same filter as InputQueue (repeats and
+    reversals are ignored), the train moves, coal under the head is picked up
+    and replaced by two new pieces, coal on the rest of the body is replaced,
+    and leaving the grid or running into the body ends the episode. Coal that
+    lands on the body is moved at once, where Game can take one more tick.
+
+    step() takes one action per board and returns Gym style
+    (observations, rewards, terminated, truncated, info). Finished boards are
+    reset straight away, so the returned observation of a finished board
+    already shows its next episode; info["score"] holds the final score.
+    Observations are written into a reused buffer, copy them to keep them.
+    """
+
+    def __init__(
+        self,
+        num_envs,
+        seed=None,
+        observation="grid",
+        crop_radius=5,
+        max_steps=None,
+        coal_reward=1.0,
+        death_reward=-1.0,
+        step_reward=0.0,
+    ):
+        if observation not in ("grid", "crop"):
+            raise ValueError(f"Unknown observation type: {observation}")
+        n = num_envs
+        self.num_envs = n
+        self.observation = observation
+        self.crop_radius = crop_radius
+        self.max_steps = max_steps
+        self.coal_reward = coal_reward
+        self.death_reward = death_reward
+        self.step_reward = step_reward
+        self.rng = np.random.default_rng(seed)
+        self.envs = np.arange(n)
+
+        # body[k] of board i is ring[i, (head_index[i] - k) % MAX_LENGTH]
+        self.ring_x = np.zeros((n, MAX_LENGTH), dtype=np.int16)
+        self.ring_y = np.zeros((n, MAX_LENGTH), dtype=np.int16)
+        self.head_index = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.head_x = np.zeros(n, dtype=np.int16)
+        self.head_y = np.zeros(n, dtype=np.int16)
+        self.dir_x = np.zeros(n, dtype=np.int16)
+        self.dir_y = np.zeros(n, dtype=np.int16)
+        self.grow = np.zeros(n, dtype=bool)
+        self.steps = np.zeros(n, dtype=np.int64)
+
+        if observation == "grid":
+            # The boards live inside the observation buffer, so observing
+            # copies nothing; only the head channel is kept up to date
+            self.obs = np.zeros((n, 3, CELL_COUNT, CELL_COUNT), dtype=np.uint8)
+            self.board = self.obs[:, BODY]
+            self.coal = self.obs[:, COAL]
+        else:
+            side = 2 * crop_radius + 1
+            self.obs = np.zeros((n, 3, side, side), dtype=np.uint8)
+            self.crop_offsets = np.arange(-crop_radius, crop_radius + 1, dtype=np.int16)
+            self.board = np.zeros((n, CELL_COUNT, CELL_COUNT), dtype=np.uint8)
+            self.coal = np.zeros((n, CELL_COUNT, CELL_COUNT), dtype=np.uint8)
+
+    @property
+    def score(self):
+        return self.length - 3
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.__reset_envs(self.envs)
+        return self.__observe()
+
+    def __reset_envs(self, ids):
+        self.board[ids] = 0
+        self.coal[ids] = 0
+        if self.observation == "grid":
+            self.obs[ids, HEAD] = 0
+        start = len(PLAYER_START)
+        for k, (x, y) in enumerate(PLAYER_START):
+            # PLAYER_START runs head first, the ring runs tail first
+            self.ring_x[ids, start - 1 - k] = x
+            self.ring_y[ids, start - 1 - k] = y
+            self.board[ids, y, x] = 1
+        self.head_index[ids] = start - 1
+        self.length[ids] = start
+        self.head_x[ids], self.head_y[ids] = PLAYER_START[0]
+        if self.observation == "grid":
+            self.obs[ids, HEAD, PLAYER_START[0][1], PLAYER_START[0][0]] = 1
+        self.dir_x[ids] = 0
+        self.dir_y[ids] = 0
+        self.grow[ids] = False
+        self.steps[ids] = 0
+        self.__spawn_coal(np.repeat(ids, START_COAL))
+
+    def __spawn_coal(self, ids):
+        # One piece per entry of ids, drawn like random_coal_cell
+        while ids.size:
+            xs = self.rng.integers(COAL_MARGIN, CELL_COUNT - COAL_MARGIN, ids.size)
+            ys = np.clip(
+                self.rng.integers(0, CELL_COUNT // 2, ids.size) * 2,
+                COAL_MARGIN,
+                CELL_COUNT - 1 - COAL_MARGIN,
+            )
+            # Coal under the head stays, like in Game; the body would clear it
+            on_body = (self.board[ids, ys, xs] > 0) & (
+                (xs != self.head_x[ids]) | (ys != self.head_y[ids])
+            )
+            keep = ~on_body
+            np.add.at(self.coal, (ids[keep], ys[keep], xs[keep]), 1)
+            ids = ids[on_body]
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        envs = self.envs
+        ax = MOVE_X[actions]
+        ay = MOVE_Y[actions]
+
+        # InputQueue.next_direction: repeats and reversals keep the direction
+        ignored = ((ax == self.dir_x) & (ay == self.dir_y)) | (
+            (ax == -self.dir_x) & (ay == -self.dir_y)
+        )
+        self.dir_x = np.where(ignored, self.dir_x, ax)
+        self.dir_y = np.where(ignored, self.dir_y, ay)
+
+        # Train.update: the tail leaves unless the train grows this move
+        shrink = envs[~self.grow]
+        tail = (self.head_index[shrink] - (self.length[shrink] - 1)) % MAX_LENGTH
+        self.board[shrink, self.ring_y[shrink, tail], self.ring_x[shrink, tail]] -= 1
+        self.length += self.grow
+        self.grow[:] = False
+
+        neck_x, neck_y = self.head_x, self.head_y
+        self.head_x = neck_x + self.dir_x
+        self.head_y = neck_y + self.dir_y
+        self.head_index = (self.head_index + 1) % MAX_LENGTH
+        self.ring_x[envs, self.head_index] = self.head_x
+        self.ring_y[envs, self.head_index] = self.head_y
+        self.steps += 1
+
+        inside = (
+            (self.head_x >= 0)
+            & (self.head_x < CELL_COUNT)
+            & (self.head_y >= 0)
+            & (self.head_y < CELL_COUNT)
+        )
+        hx = np.where(inside, self.head_x, 0)
+        hy = np.where(inside, self.head_y, 0)
+        hit_body = inside & (self.board[envs, hy, hx] > 0)
+        self.board[envs[inside], hy[inside], hx[inside]] += 1
+        if self.observation == "grid":
+            self.obs[envs, HEAD, neck_y, neck_x] = 0
+            self.obs[envs[inside], HEAD, hy[inside], hx[inside]] = 1
+
+        # Game.check_collision: pickup, then coal on the body is replaced
+        picked = inside & (self.coal[envs, hy, hx] > 0)
+        picked_ids = envs[picked]
+        self.coal[picked_ids, hy[picked], hx[picked]] -= 1
+        self.grow[picked] = True
+        under_neck = self.coal[envs, neck_y, neck_x] > 0
+        neck_ids = envs[under_neck]
+        self.coal[neck_ids, neck_y[under_neck], neck_x[under_neck]] -= 1
+        self.__spawn_coal(np.concatenate([np.repeat(picked_ids, 2), neck_ids]))
+
+        # Game.check_fail
+        terminated = ~inside | hit_body
+        truncated = ~terminated
+        if self.max_steps is not None:
+            truncated &= self.steps >= self.max_steps
+        else:
+            truncated[:] = False
+
+        rewards = np.full(self.num_envs, self.step_reward, dtype=np.float32)
+        rewards += picked * np.float32(self.coal_reward)
+        rewards += terminated * np.float32(self.death_reward)
+
+        done = terminated | truncated
+        info = {"score": np.where(done, self.score, 0)}
+        if done.any():
+            self.__reset_envs(envs[done])
+        return self.__observe(), rewards, terminated, truncated, info
+
+    def __observe(self):
+        obs = self.obs
+        if self.observation == "grid":
+            return obs
+
+        # Egocentric crop around each head; cells off the grid are walls
+        ys = self.head_y[:, None] + self.crop_offsets
+        xs = self.head_x[:, None] + self.crop_offsets
+        inside = ((ys >= 0) & (ys < CELL_COUNT))[:, :, None] & ((xs >= 0) & (xs < CELL_COUNT))[
+            :, None, :
+        ]
+        ys = np.clip(ys, 0, CELL_COUNT - 1)[:, :, None]
+        xs = np.clip(xs, 0, CELL_COUNT - 1)[:, None, :]
+        envs = self.envs[:, None, None]
+        obs[:, CROP_BODY] = np.minimum(self.board[envs, ys, xs], 1) * inside
+        obs[:, CROP_COAL] = np.minimum(self.coal[envs, ys, xs], 1) * inside
+        obs[:, CROP_WALL] = ~inside
+        return obs
+
+    # Read-only views for checking the rules against ListSimulation
+
+    def player_cells(self, i):
+        index = (self.head_index[i] - np.arange(self.length[i])) % MAX_LENGTH
+        return list(zip(self.ring_x[i, index].tolist(), self.ring_y[i, index].tolist()))
+
+    def coal_cells(self, i):
+        ys, xs = np.nonzero(self.coal[i])
+        return [
+            (x, y)
+            for x, y, count in zip(xs.tolist(), ys.tolist(), self.coal[i, ys, xs].tolist())
+            for _ in range(count)
+        ]
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import namedtuple
+from pygame.math import Vector2
+
+TICK_MS = 150
+
+# Everything the renderer needs for one gameplay frame. Bodies and coal are
+# copied into tuples, so a published state is never modified afterwards.
+FrameState = namedtuple(
+    "FrameState",
+    [
+        "tick",
+        "player_body",
+        "player_direction",
+        "fog_disabled",
+        "ai_body",
+        "ai_direction",
+        "coal",
+        "powerups",
+        "events",
+        "score",
+        "tutorial_message",
+    ],
+)
+
+
+def capture_state(game, tick):
+    ai = game.ai_train
+    ai_alive = ai is not None and ai.alive
+    return FrameState(
+        tick=tick,
+        player_body=tuple(Vector2(block) for block in game.train.body),
+        player_direction=Vector2(game.train.direction),
+        fog_disabled=game.train.fog_disabled,
+        ai_body=tuple(Vector2(block) for block in ai.body) if ai_alive else None,
+        ai_direction=Vector2(ai.direction) if ai_alive else None,
+        coal=tuple(Vector2(pos) for pos in game.coal.positions),
+        powerups=tuple(game.world_powerups),
+        events=tuple(event.name for event in game.event_scheduler.current_events),
+        score=len(game.train.body) - 3,
+        tutorial_message=(
+            game.tutorial_steps[game.tutorial_step]["message"] if game.tutorial_mode else None
+        ),
+    )
+
+
+class StateBuffer:
+    """Two snapshot slots; the writer fills the back one and flips the index.
+
+    Reading is a single attribute lookup, so the render thread never locks.
+    """
+
+    def __init__(self, state):
+        self.slots = [state, state]
+        self.front = 0
+
+    def publish(self, state):
+        back = 1 - self.front
+        self.slots[back] = state
+        self.front = back
+
+    def read(self):
+        return self.slots[self.front]
+
+
+class SimulationThread(threading.Thread):
+    """Steps the game every TICK_MS on its own thread and publishes snapshots."""
+
+    def __init__(self, game, tick_ms=TICK_MS):
+        super().__init__(name="simulation", daemon=True)
+        self.game = game
+        self.tick_ms = tick_ms
+        self.tick = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        next_tick = time.perf_counter()
+        while not self.stopped.is_set():
+            next_tick += self.tick_ms / 1000
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                self.stopped.wait(delay)
+            else:
+                next_tick = time.perf_counter()  # fell behind, do not burst
+            with self.game.lock:
+                if self.stopped.is_set():
+                    break
+                self.game.update()
+                self.tick += 1
+                self.game.publish_state(self.tick)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
@@ -0,0 +1,151 @@
+import json
+import queue
+import threading
+from array import array
+import numpy as np
+from constants import CELL_COUNT
+
+# Record kinds
+TICK = 0
+PICKUP = 1
+DEATH = 2
+AI_PICKUP = 3
+AI_DEATH = 4
+AI_RAM = 5
+RUN_START = 6
+
+KIND_NAMES = ["tick", "pickup", "death", "ai_pickup", "ai_death", "ai_ram", "run_start"]
+
+# Death causes are stored as small codes so a record stays five ints
+CAUSES = [
+    "unknown",
+    "wall",
+    "self collision",
+    "hit AI train",
+    "head-on collision",
+    "player collision",
+    "trapped",
+]
+
+FIELDS = 5  # tick, kind, x, y, value
+DEFAULT_CAPACITY = 4096
+
+
+def cause_code(cause):
+    return CAUSES.index(cause) if cause in CAUSES else 0
+
+
+class Telemetry:
+    """Gameplay records in a preallocated ring of ints plus grid heatmaps.
+
+    Every record is (tick, kind, x, y, value) written in place into one
+    array, so recording allocates nothing. When the ring fills up, or on
+    flush(), the filled part is copied and handed to a writer thread as
+    compact int32 rows (.bin) or JSON lines (.jsonl). While disabled every
+    call returns after a single attribute check.
+
+    Records and counts stay in the array module: a single store or
+    increment there is cheaper than in a NumPy array (about half the time
+    for the heatmap increments). heatmaps() shares the counts with NumPy
+    without copying.
+    Deaths off the grid, such as wall deaths, are counted at the nearest
+    edge cell.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.enabled = False
+        self.capacity = capacity
+        self.records = array("i", bytes(4 * FIELDS * capacity))
+        self.count = 0
+        self.tick_count = 0
+        self.path = None
+        self.pending = queue.Queue()
+        self.writer = None
+        cells = CELL_COUNT * CELL_COUNT
+        self.deaths = array("I", bytes(4 * cells))
+        self.pickups = array("I", bytes(4 * cells))
+        self.visits = array("I", bytes(4 * cells))
+
+    def enable(self, path):
+        self.path = path
+        self.enabled = True
+        self.writer = threading.Thread(target=self.__write_batches, name="telemetry", daemon=True)
+        self.writer.start()
+
+    def record(self, kind, pos=None, value=0):
+        if not self.enabled:
+            return
+        x, y = (int(pos.x), int(pos.y)) if pos is not None else (-1, -1)
+        i = self.count * FIELDS
+        records = self.records
+        records[i] = self.tick_count
+        records[i + 1] = kind
+        records[i + 2] = x
+        records[i + 3] = y
+        records[i + 4] = value
+        self.count += 1
+        if kind in (DEATH, AI_DEATH):
+            if pos is not None:
+                cx = min(max(x, 0), CELL_COUNT - 1)
+                cy = min(max(y, 0), CELL_COUNT - 1)
+                self.deaths[cy * CELL_COUNT + cx] += 1
+        elif 0 <= x < CELL_COUNT and 0 <= y < CELL_COUNT:
+            cell = y * CELL_COUNT + x
+            if kind == TICK:
+                self.visits[cell] += 1
+            elif kind in (PICKUP, AI_PICKUP):
+                self.pickups[cell] += 1
+        if self.count == self.capacity:
+            self.flush()
+
+    def tick(self, head, length):
+        if not self.enabled:
+            return
+        self.tick_count += 1
+        self.record(TICK, head, length)
+
+    def flush(self):
+        if not self.enabled or not self.count:
+            return
+        self.pending.put(self.records[: self.count * FIELDS])
+        self.count = 0
+
+    def __write_batches(self):
+        binary = not self.path.endswith(".jsonl")
+        with open(self.path, "ab" if binary else "a") as f:
+            while True:
+                batch = self.pending.get()
+                if batch is None:
+                    break
+                if binary:
+                    batch.tofile(f)
+                else:
+                    for i in range(0, len(batch), FIELDS):
+                        tick, kind, x, y, value = batch[i : i + FIELDS]
+                        f.write(
+                            json.dumps(
+                                {"tick": tick, "kind": KIND_NAMES[kind], "x": x, "y": y, "value": value}
+                            )
+                            + "\n"
+                        )
+                f.flush()
+
+    def heatmaps(self):
+        # 50x50 uint32 views of the live counts, indexed [y, x]
+        def grid(counts):
+            return np.frombuffer(counts, dtype=np.uint32).reshape(CELL_COUNT, CELL_COUNT)
+
+        return {"deaths": grid(self.deaths), "pickups": grid(self.pickups), "visits": grid(self.visits)}
+
+    def close(self):
+        if not self.enabled:
+            return
+        self.flush()
+        self.pending.put(None)
+        self.writer.join()
+        with open(self.path + ".heatmaps.json", "w") as f:
+            json.dump({name: counts.tolist() for name, counts in self.heatmaps().items()}, f)
+        self.enabled = False
+
+
+telemetry = Telemetry()
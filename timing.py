@@ -0,0 +1,23 @@
+import time
+
+
+class StartupTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = []
+        self.reported = False
+
+    def mark(self, label):
+        if all(existing != label for existing, _ in self.marks):
+            self.marks.append((label, (time.perf_counter() - self.start) * 1000))
+
+    def has(self, label):
+        return any(existing == label for existing, _ in self.marks)
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+        print("Startup timing:")
+        for label, elapsed_ms in self.marks:
+            print(f"  {label:<20} {elapsed_ms:8.1f} ms")
@@ -0,0 +1,158 @@
+import pygame
+
+WHITE = (255, 255, 255)
+GREY = (150, 150, 150)
+
+_fonts = {}
+
+
+def get_font(size):
+    # pygame.font.Font(None, size) reads the font file again on every call
+    if size not in _fonts:
+        _fonts[size] = pygame.font.Font(None, size)
+    return _fonts[size]
+
+
+class Widget:
+    """Base for retained widgets.
+
+    dirty is set whenever a widget would look different and cleared when it
+    is drawn, so a parent only recomposes its surface when a child changed.
+    """
+
+    def __init__(self):
+        self.dirty = True
+
+    def invalidate(self):
+        self.dirty = True
+
+    def needs_redraw(self):
+        return self.dirty
+
+    def draw(self, surface):
+        self.dirty = False
+
+
+class Label(Widget):
+    """One line of text, rendered again only when its text or color changes."""
+
+    def __init__(self, text, font, color=WHITE, center=(0, 0)):
+        super().__init__()
+        self.text = text
+        self.font = font
+        self.color = color
+        self.center = center
+        self.image = None
+
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self.image = None
+            self.invalidate()
+
+    def set_color(self, color):
+        if color != self.color:
+            self.color = color
+            self.image = None
+            self.invalidate()
+
+    def move_to(self, center):
+        if center != self.center:
+            self.center = center
+            self.invalidate()
+
+    def draw(self, surface):
+        if self.image is None:
+            self.image = self.font.render(self.text, True, self.color)
+        surface.blit(self.image, self.image.get_rect(center=self.center))
+        self.dirty = False
+
+
+class OptionList(Widget):
+    """Vertical list of labels with one focused entry.
+
+    Up and down move the focus, wrapping around, and return passes the
+    focused option's text to callback.
+    """
+
+    def __init__(self, options, callback, font, spacing=50):
+        super().__init__()
+        self.callback = callback
+        self.font = font
+        self.spacing = spacing
+        self.center_x = 0
+        self.top = 0
+        self.focus = 0
+        self.labels = []
+        self.set_options(options)
+
+    @property
+    def options(self):
+        return [label.text for label in self.labels]
+
+    def set_options(self, options):
+        self.labels = [Label(text, self.font, GREY) for text in options]
+        self.place(self.center_x, self.top)
+        self.set_focus(min(self.focus, len(self.labels) - 1))
+        self.invalidate()
+
+    def set_option(self, index, text):
+        self.labels[index].set_text(text)
+
+    def place(self, center_x, top):
+        self.center_x = center_x
+        self.top = top
+        for i, label in enumerate(self.labels):
+            label.move_to((center_x, top + i * self.spacing))
+
+    def set_focus(self, index):
+        self.focus = index % len(self.labels) if self.labels else 0
+        for i, label in enumerate(self.labels):
+            label.set_color(WHITE if i == self.focus else GREY)
+
+    def activate(self):
+        if self.labels:
+            self.callback(self.labels[self.focus].text)
+
+    def handle_input(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_UP:
+                self.set_focus(self.focus - 1)
+            elif event.key == pygame.K_DOWN:
+                self.set_focus(self.focus + 1)
+            elif event.key == pygame.K_RETURN:
+                self.activate()
+
+    def needs_redraw(self):
+        return self.dirty or any(label.dirty for label in self.labels)
+
+    def draw(self, surface):
+        for label in self.labels:
+            label.draw(surface)
+        self.dirty = False
+
+
+class View(Widget):
+    """Full-screen dimming overlay with widgets composited onto it.
+
+    The composite is kept between frames, so a frame where nothing changed
+    costs a single blit.
+    """
+
+    def __init__(self, size, overlay_alpha, widgets):
+        super().__init__()
+        self.size = size
+        self.overlay_alpha = overlay_alpha
+        self.widgets = widgets
+        self.image = pygame.Surface(size, pygame.SRCALPHA)
+
+    def needs_redraw(self):
+        return self.dirty or any(widget.needs_redraw() for widget in self.widgets)
+
+    def draw(self, surface):
+        if self.needs_redraw():
+            self.image.fill((0, 0, 0, self.overlay_alpha))
+            for widget in self.widgets:
+                widget.draw(self.image)
+            self.dirty = False
+        surface.blit(self.image, (0, 0))